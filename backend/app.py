@@ -2,7 +2,9 @@
 Main Flask Application for Fruit Classification System
 """
 from flask import Flask, render_template, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from types import MappingProxyType
 import os
 import sys
 
@@ -13,6 +15,16 @@ from backend.config import Config
 from backend.routes.api import api_bp
 
 
+class JSONProvider(DefaultJSONProvider):
+    """JSON provider that also serializes the read-only lookup tables shared by the models"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, MappingProxyType):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
+
+
 def create_app():
     """Create and configure the Flask application"""
     app = Flask(
@@ -23,6 +35,7 @@ def create_app():
     
     # Load configuration
     app.config.from_object(Config)
+    app.json = JSONProvider(app)
     
     # Enable CORS
     CORS(app)
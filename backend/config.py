@@ -15,11 +15,15 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'data/uploads')
     MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB
+    LOCALE_CACHE_DIR = os.getenv('LOCALE_CACHE_DIR', 'data/locale_cache')  # Compiled translations
     
     # OpenAI Configuration
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
     OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o')
     USE_OPENAI = os.getenv('USE_OPENAI', 'true').lower() == 'true'
+    OPENAI_CONCURRENCY = int(os.getenv('OPENAI_CONCURRENCY', 5))  # Parallel API requests
+    OPENAI_CACHE_PATH = os.getenv('OPENAI_CACHE_PATH', 'data/openai_cache.db')  # Empty to disable
+    OPENAI_IMAGE_DETAIL = os.getenv('OPENAI_IMAGE_DETAIL', 'low')  # low, high or auto
     
     # Model Configuration (for local model if needed)
     MODEL_PATH = os.getenv('MODEL_PATH', 'trained_models/fruit_classifier.h5')
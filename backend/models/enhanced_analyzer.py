@@ -248,7 +248,7 @@ Rules:
                 }
         
         # Apply translations
-        result = translate_result(result, language)
+        result = translate_result(result, language, inplace=True)
         
         return result
     
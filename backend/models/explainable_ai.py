@@ -6,16 +6,43 @@ Highlights image regions that influenced the classification decision.
 from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
 import base64
+import hashlib
 import io
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 
+# Last convolutional layer of common Keras application backbones, keyed by
+# the architecture prefix of the model name (e.g. 'mobilenetv2_1.00_224')
+_KNOWN_LAST_CONV = {
+    'mobilenetv2': 'Conv_1',
+    'resnet50': 'conv5_block3_out',
+    'resnet50v2': 'post_relu',
+    'efficientnetb0': 'top_conv',
+    'vgg16': 'block5_conv3',
+    'inception': 'mixed10',
+}
+
+
 class ExplainableAI:
     """
     Provides explainability features for AI predictions.
     Implements Grad-CAM visualization and attention analysis.
     """
     
+    # Encoded PNGs keyed by image content hash, shared across instances since
+    # the API creates a new explainer per request
+    _PNG_CACHE_SIZE = 128
+    
+    # zlib level for the encoded PNGs; 6 is Pillow's default. They are sent
+    # base64-encoded in every response, so payload size matters more than
+    # the server CPU a lower level would save
+    PNG_COMPRESS_LEVEL = 6
+    _png_cache: "OrderedDict[bytes, str]" = OrderedDict()
+    _png_cache_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize explainable AI module"""
         self._tf_available = self._check_tensorflow()
@@ -70,20 +97,13 @@ class ExplainableAI:
         
         try:
             import tensorflow as tf
-            from tensorflow.keras.preprocessing import image as keras_image
             
             # Load and preprocess image
-            img = keras_image.load_img(image_path, target_size=(224, 224))
-            img_array = keras_image.img_to_array(img)
-            img_array = np.expand_dims(img_array, axis=0)
-            img_array = img_array / 255.0
+            img_array = np.expand_dims(self._load_image_array(image_path), axis=0)
             
             # Find last convolutional layer if not specified
             if layer_name is None:
-                for layer in reversed(model.layers):
-                    if 'conv' in layer.name.lower():
-                        layer_name = layer.name
-                        break
+                layer_name = self._find_last_conv_layer(model)
             
             if layer_name is None:
                 return {'error': 'No convolutional layer found in model'}
@@ -115,6 +135,7 @@ class ExplainableAI:
             # Normalize heatmap
             heatmap = tf.maximum(heatmap, 0) / tf.maximum(tf.reduce_max(heatmap), 1e-10)
             heatmap = heatmap.numpy()
+            stats = self._compute_heatmap_stats(heatmap)
             
             # Generate visualization
             visualization = self._create_heatmap_overlay(image_path, heatmap)
@@ -126,8 +147,8 @@ class ExplainableAI:
                 'target_class': int(target_class),
                 'heatmap': visualization['heatmap_base64'],
                 'overlay': visualization['overlay_base64'],
-                'attention_regions': self._identify_attention_regions(heatmap),
-                'explanation': self._generate_text_explanation(heatmap),
+                'attention_regions': self._identify_attention_regions(stats),
+                'explanation': self._generate_text_explanation(stats),
                 'generated_at': datetime.now().isoformat()
             }
             
@@ -138,6 +159,138 @@ class ExplainableAI:
                 'fallback': self._generate_fallback_explanation(image_path)
             }
     
+    def generate_gradcam_batch(
+        self,
+        model,
+        image_paths: List[str],
+        target_classes: Optional[List[Optional[int]]] = None,
+        layer_name: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Generate Grad-CAM visualizations for several images in one pass.
+        
+        The images are stacked into a single batch so the forward and
+        backward passes run once for all of them.
+        
+        Args:
+            model: Trained Keras/TensorFlow model
+            image_paths: Paths to input images
+            target_classes: Target class index per image (None = predicted class)
+            layer_name: Target layer for gradients (None = last conv layer)
+        
+        Returns:
+            List of Grad-CAM visualization results, one per image
+        """
+        if not self._tf_available:
+            return [self._generate_fallback_explanation(path) for path in image_paths]
+        
+        if not image_paths:
+            return []
+        
+        try:
+            import tensorflow as tf
+            
+            images = np.stack([self._load_image_array(path) for path in image_paths])
+            
+            if layer_name is None:
+                layer_name = self._find_last_conv_layer(model)
+            
+            if layer_name is None:
+                return [{'error': 'No convolutional layer found in model'} for _ in image_paths]
+            
+            grad_model = tf.keras.models.Model(
+                [model.inputs],
+                [model.get_layer(layer_name).output, model.output]
+            )
+            
+            # -1 marks images whose predicted class should be explained
+            if target_classes is None:
+                target_classes = [None] * len(image_paths)
+            targets = [-1 if t is None else int(t) for t in target_classes]
+            
+            heatmaps, resolved_targets = self._gradcam_core_batch(
+                grad_model,
+                tf.constant(images),
+                tf.constant(targets, dtype=tf.int32)
+            )
+            heatmaps = heatmaps.numpy()
+            resolved_targets = resolved_targets.numpy()
+            
+            # PNG encoding releases the GIL, so overlays can be built concurrently
+            with ThreadPoolExecutor(max_workers=min(8, len(image_paths))) as executor:
+                visualizations = list(executor.map(self._create_heatmap_overlay, image_paths, heatmaps))
+            
+            results = []
+            generated_at = datetime.now().isoformat()
+            for heatmap, target, visualization in zip(heatmaps, resolved_targets, visualizations):
+                stats = self._compute_heatmap_stats(heatmap)
+                results.append({
+                    'success': True,
+                    'method': 'grad-cam',
+                    'target_layer': layer_name,
+                    'target_class': int(target),
+                    'heatmap': visualization['heatmap_base64'],
+                    'overlay': visualization['overlay_base64'],
+                    'attention_regions': self._identify_attention_regions(stats),
+                    'explanation': self._generate_text_explanation(stats),
+                    'generated_at': generated_at
+                })
+            return results
+            
+        except Exception as e:
+            return [
+                {
+                    'success': False,
+                    'error': str(e),
+                    'fallback': self._generate_fallback_explanation(path)
+                }
+                for path in image_paths
+            ]
+    
+    def _gradcam_core_batch(self, grad_model, images, targets):
+        """Compute normalized Grad-CAM heatmaps for a batch of images"""
+        import tensorflow as tf
+        
+        with tf.GradientTape() as tape:
+            conv_outputs, predictions = grad_model(images)
+            predicted = tf.argmax(predictions, axis=1, output_type=tf.int32)
+            targets = tf.where(targets < 0, predicted, targets)
+            indices = tf.stack([tf.range(tf.shape(predictions)[0]), targets], axis=1)
+            loss = tf.gather_nd(predictions, indices)
+        
+        # Each image's loss only depends on its own activations, so one
+        # backward pass yields per-image gradients
+        grads = tape.gradient(loss, conv_outputs)
+        pooled_grads = tf.reduce_mean(grads, axis=(1, 2))
+        
+        heatmaps = tf.einsum('nhwc,nc->nhw', conv_outputs, pooled_grads)
+        max_values = tf.reduce_max(heatmaps, axis=(1, 2), keepdims=True)
+        heatmaps = tf.maximum(heatmaps, 0) / tf.maximum(max_values, 1e-10)
+        
+        return heatmaps, targets
+    
+    def _load_image_array(self, image_path: str) -> np.ndarray:
+        """Load an image as a normalized 224x224 float array"""
+        from tensorflow.keras.preprocessing import image as keras_image
+        
+        img = keras_image.load_img(image_path, target_size=(224, 224))
+        return keras_image.img_to_array(img) / 255.0
+    
+    def _find_last_conv_layer(self, model) -> Optional[str]:
+        """Find the last convolutional layer, using known backbones before scanning"""
+        known = _KNOWN_LAST_CONV.get(model.name.split('_', 1)[0].lower())
+        if known is not None:
+            try:
+                model.get_layer(known)
+                return known
+            except ValueError:
+                pass
+        
+        for layer in reversed(model.layers):
+            if 'conv' in layer.name.lower():
+                return layer.name
+        return None
+    
     def _create_heatmap_overlay(
         self,
         image_path: str,
@@ -164,9 +317,10 @@ class ExplainableAI:
             # Resize heatmap to match image
             heatmap_resized = cv2.resize(heatmap, (224, 224))
             
-            # Create colored heatmap
-            heatmap_colored = cm.jet(heatmap_resized)[:, :, :3]
-            heatmap_colored = (heatmap_colored * 255).astype(np.uint8)
+            # Create colored heatmap; uint8 indices make the colormap a plain
+            # LUT lookup and bytes=True returns uint8 colors directly
+            heatmap_indices = np.clip(heatmap_resized * 255, 0, 255).astype(np.uint8)
+            heatmap_colored = cm.jet(heatmap_indices, bytes=True)[:, :, :3]
             
             # Create overlay
             overlay = (heatmap_colored * 0.4 + original * 0.6).astype(np.uint8)
@@ -192,43 +346,73 @@ class ExplainableAI:
         try:
             from PIL import Image
             
-            img = Image.fromarray(img_array.astype(np.uint8))
+            hasher = hashlib.blake2b(digest_size=16)
+            hasher.update(str((img_array.shape, img_array.dtype.str)).encode())
+            hasher.update(np.ascontiguousarray(img_array))
+            key = hasher.digest()
+            
+            with self._png_cache_lock:
+                cached = self._png_cache.get(key)
+                if cached is not None:
+                    self._png_cache.move_to_end(key)
+                    return cached
+            
+            img = Image.fromarray(img_array.astype(np.uint8, copy=False))
             buffer = io.BytesIO()
-            img.save(buffer, format='PNG')
-            buffer.seek(0)
-            return f"data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode()}"
+            img.save(buffer, format='PNG', compress_level=self.PNG_COMPRESS_LEVEL)
+            # getbuffer() exposes the PNG bytes without copying them out first
+            encoded = 'data:image/png;base64,' + base64.b64encode(buffer.getbuffer()).decode('ascii')
+            
+            with self._png_cache_lock:
+                self._png_cache[key] = encoded
+                if len(self._png_cache) > self._PNG_CACHE_SIZE:
+                    self._png_cache.popitem(last=False)
+            
+            return encoded
         except:
             return None
     
-    def _identify_attention_regions(self, heatmap: np.ndarray) -> List[Dict[str, Any]]:
-        """Identify high-attention regions in heatmap"""
-        regions = []
-        
+    def _compute_heatmap_stats(self, heatmap: np.ndarray) -> Dict[str, Any]:
+        """Compute heatmap statistics shared by region and text explanations"""
         # Find threshold for high attention
         threshold = 0.5
         high_attention = heatmap >= threshold
+        count = int(np.count_nonzero(high_attention))
         
-        # Calculate region statistics
-        if np.any(high_attention):
-            rows, cols = np.where(high_attention)
-            if len(rows) > 0:
-                center_y = int(np.mean(rows) / heatmap.shape[0] * 100)
-                center_x = int(np.mean(cols) / heatmap.shape[1] * 100)
-                coverage = np.sum(high_attention) / heatmap.size * 100
-                
-                regions.append({
-                    'type': 'primary_focus',
-                    'center': {'x': center_x, 'y': center_y},
-                    'coverage_percentage': round(coverage, 1),
-                    'intensity': round(float(np.max(heatmap)), 3)
-                })
+        stats = {
+            'high_attention_count': count,
+            'max_attention': float(np.max(heatmap)),
+            'coverage': count / heatmap.size * 100,
+            'center': None
+        }
+        
+        if count:
+            rows, cols = np.nonzero(high_attention)
+            stats['center'] = {
+                'x': int(np.mean(cols) / heatmap.shape[1] * 100),
+                'y': int(np.mean(rows) / heatmap.shape[0] * 100)
+            }
+        
+        return stats
+    
+    def _identify_attention_regions(self, stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Identify high-attention regions from heatmap statistics"""
+        regions = []
+        
+        if stats['high_attention_count']:
+            regions.append({
+                'type': 'primary_focus',
+                'center': stats['center'],
+                'coverage_percentage': round(stats['coverage'], 1),
+                'intensity': round(stats['max_attention'], 3)
+            })
         
         return regions
     
-    def _generate_text_explanation(self, heatmap: np.ndarray) -> str:
+    def _generate_text_explanation(self, stats: Dict[str, Any]) -> str:
         """Generate human-readable explanation of attention pattern"""
-        max_attention = float(np.max(heatmap))
-        coverage = np.sum(heatmap >= 0.5) / heatmap.size * 100
+        max_attention = stats['max_attention']
+        coverage = stats['coverage']
         
         # Determine focus pattern
         if coverage < 10:
@@ -447,8 +631,9 @@ class ExplainableAI:
     
     def _summarize_factors(self, factors: List[Dict]) -> str:
         """Summarize factor contributions"""
-        positive = sum(1 for f in factors if f['contribution'] == 'positive')
-        negative = sum(1 for f in factors if f['contribution'] == 'negative')
+        contributions = Counter(f['contribution'] for f in factors)
+        positive = contributions['positive']
+        negative = contributions['negative']
         
         if positive > negative:
             return "The quality assessment is predominantly positive based on the analyzed factors."
@@ -464,10 +649,12 @@ class ExplainableAI:
         if score < 70:
             suggestions.append("Consider sorting for processing rather than fresh sale")
         
-        if 'bruise' in str(defects).lower():
+        defect_set = {d.lower() for d in defects}
+        
+        if any('bruise' in d for d in defect_set):
             suggestions.append("Improve handling to reduce bruising")
         
-        if 'mold' in str(defects).lower() or 'rot' in str(defects).lower():
+        if any('mold' in d or 'rot' in d for d in defect_set):
             suggestions.append("Check cold chain integrity")
             suggestions.append("Reduce storage time")
         
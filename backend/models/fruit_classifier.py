@@ -23,31 +23,45 @@ class FruitClassificationModel:
         self.num_classes = num_classes
         self.image_size = image_size
         self.model = None
+        self.base_model = None
+        self.pooling = None
+        self.head_layers = None
         
     def build_model(self):
         """
         Build CNN model using Transfer Learning with MobileNetV2
         """
         # Load pre-trained MobileNetV2 without top layers
-        base_model = MobileNetV2(
+        self.base_model = MobileNetV2(
             input_shape=(self.image_size, self.image_size, 3),
             include_top=False,
             weights='imagenet'
         )
         
         # Freeze base model layers
-        base_model.trainable = False
+        self.base_model.trainable = False
         
-        # Build model
-        self.model = models.Sequential([
-            base_model,
-            layers.GlobalAveragePooling2D(),
+        # Pools the backbone's feature maps into one vector per image; part of
+        # the feature extractor, so cached features are the pooled vectors
+        self.pooling = layers.GlobalAveragePooling2D()
+        
+        # Classification head, shared with the head-only model used when
+        # training on precomputed backbone features
+        self.head_layers = [
             layers.Dense(512, activation='relu'),
             layers.Dropout(0.5),
             layers.Dense(256, activation='relu'),
             layers.Dropout(0.3),
             layers.Dense(self.num_classes, activation='softmax')
-        ])
+        ]
+        
+        # Build model; the backbone always runs in inference mode so its
+        # BatchNorm statistics survive the fine-tuning phase
+        inputs = keras.Input(shape=(self.image_size, self.image_size, 3))
+        x = self.pooling(self.base_model(inputs, training=False))
+        for layer in self.head_layers:
+            x = layer(x)
+        self.model = models.Model(inputs, x)
         
         # Compile model
         self.model.compile(
@@ -58,19 +72,62 @@ class FruitClassificationModel:
         
         return self.model
     
-    def train_model(self, train_data_dir, validation_data_dir=None, epochs=20, batch_size=32):
+    def _build_head_model(self):
+        """Build a model of just the classification head on pooled backbone features"""
+        inputs = keras.Input(shape=(self.base_model.output_shape[-1],))
+        x = inputs
+        for layer in self.head_layers:
+            x = layer(x)
+        head_model = models.Model(inputs, x)
+        head_model.compile(
+            optimizer=keras.optimizers.Adam(learning_rate=0.001),
+            loss='categorical_crossentropy',
+            metrics=['accuracy']
+        )
+        return head_model
+    
+    def _extract_features(self, generator):
+        """
+        Run the frozen backbone and pooling once over a generator, returning
+        the pooled feature vectors (1280 per image for MobileNetV2, rather
+        than the 7x7 maps) and labels
+        """
+        extractor = models.Sequential([self.base_model, self.pooling])
+        features = extractor.predict(generator)
+        labels = keras.utils.to_categorical(generator.classes, self.num_classes)
+        return features, labels
+    
+    def train_model(self, train_data_dir, validation_data_dir=None, epochs=20, batch_size=32,
+                    precompute_features=True, fine_tune_epochs=0, fine_tune_learning_rate=1e-5):
         """
         Train the model on fruit images
         
+        Training runs in two phases. In the first, the backbone is frozen and,
+        with precompute_features, its pooled outputs are computed once so that
+        each epoch only trains the small classification head. In the optional
+        second phase, the backbone is unfrozen and the full model is
+        fine-tuned at a low learning rate with augmentation.
+        
+        Cached features are computed from unaugmented images, so with the
+        defaults (precompute_features=True, fine_tune_epochs=0) training uses
+        no data augmentation at all. Pass precompute_features=False to train
+        the head on augmented images, or fine_tune_epochs > 0 to add an
+        augmented fine-tuning phase.
+        
         Args:
             train_data_dir: Directory containing training images
             validation_data_dir: Directory containing validation images
-            epochs: Number of training epochs
+            epochs: Number of training epochs for the frozen phase
             batch_size: Batch size for training
+            precompute_features: Train the head on cached backbone features
+            fine_tune_epochs: Number of epochs to fine-tune the unfrozen backbone
+            fine_tune_learning_rate: Learning rate for the fine-tuning phase
         """
         if self.model is None:
             self.build_model()
         
+        validation_split = 0.2 if validation_data_dir is None else 0.0
+        
         # Data augmentation for training
         train_datagen = ImageDataGenerator(
             rescale=1./255,
@@ -79,58 +136,85 @@ class FruitClassificationModel:
             height_shift_range=0.2,
             horizontal_flip=True,
             fill_mode='nearest',
-            validation_split=0.2 if validation_data_dir is None else 0.0
+            validation_split=validation_split
         )
         
-        # Prepare training data
-        train_generator = train_datagen.flow_from_directory(
-            train_data_dir,
-            target_size=(self.image_size, self.image_size),
-            batch_size=batch_size,
-            class_mode='categorical',
-            subset='training' if validation_data_dir is None else None
-        )
+        # Non-augmented pipeline for validation and feature extraction
+        plain_datagen = ImageDataGenerator(rescale=1./255, validation_split=validation_split)
         
-        # Prepare validation data
-        if validation_data_dir:
-            val_datagen = ImageDataGenerator(rescale=1./255)
-            validation_generator = val_datagen.flow_from_directory(
-                validation_data_dir,
-                target_size=(self.image_size, self.image_size),
-                batch_size=batch_size,
-                class_mode='categorical'
-            )
-        else:
-            validation_generator = train_datagen.flow_from_directory(
-                train_data_dir,
+        def flow(datagen, directory, subset=None, shuffle=True):
+            return datagen.flow_from_directory(
+                directory,
                 target_size=(self.image_size, self.image_size),
                 batch_size=batch_size,
                 class_mode='categorical',
-                subset='validation'
+                subset=subset,
+                shuffle=shuffle
             )
         
+        train_subset = 'training' if validation_data_dir is None else None
+        if validation_data_dir:
+            val_dir, val_subset = validation_data_dir, None
+        else:
+            val_dir, val_subset = train_data_dir, 'validation'
+        
         # Callbacks
-        callbacks = [
-            keras.callbacks.EarlyStopping(
-                monitor='val_loss',
-                patience=5,
-                restore_best_weights=True
-            ),
-            keras.callbacks.ReduceLROnPlateau(
-                monitor='val_loss',
-                factor=0.5,
-                patience=3,
-                min_lr=1e-7
+        def make_callbacks():
+            return [
+                keras.callbacks.EarlyStopping(
+                    monitor='val_loss',
+                    patience=5,
+                    restore_best_weights=True
+                ),
+                keras.callbacks.ReduceLROnPlateau(
+                    monitor='val_loss',
+                    factor=0.5,
+                    patience=3,
+                    min_lr=1e-7
+                )
+            ]
+        
+        # Phase 1: train the head on top of the frozen backbone
+        if precompute_features and self.base_model is not None:
+            train_features, train_labels = self._extract_features(
+                flow(plain_datagen, train_data_dir, train_subset, shuffle=False)
+            )
+            val_features, val_labels = self._extract_features(
+                flow(plain_datagen, val_dir, val_subset, shuffle=False)
+            )
+            history = self._build_head_model().fit(
+                train_features,
+                train_labels,
+                epochs=epochs,
+                batch_size=batch_size,
+                shuffle=True,
+                validation_data=(val_features, val_labels),
+                callbacks=make_callbacks()
+            )
+        else:
+            history = self.model.fit(
+                flow(train_datagen, train_data_dir, train_subset),
+                epochs=epochs,
+                validation_data=flow(plain_datagen, val_dir, val_subset),
+                callbacks=make_callbacks()
             )
-        ]
         
-        # Train model
-        history = self.model.fit(
-            train_generator,
-            epochs=epochs,
-            validation_data=validation_generator,
-            callbacks=callbacks
-        )
+        # Phase 2: unfreeze the backbone and fine-tune end to end
+        if fine_tune_epochs > 0 and self.base_model is not None:
+            self.base_model.trainable = True
+            self.model.compile(
+                optimizer=keras.optimizers.Adam(learning_rate=fine_tune_learning_rate),
+                loss='categorical_crossentropy',
+                metrics=['accuracy']
+            )
+            fine_tune_history = self.model.fit(
+                flow(train_datagen, train_data_dir, train_subset),
+                epochs=fine_tune_epochs,
+                validation_data=flow(plain_datagen, val_dir, val_subset),
+                callbacks=make_callbacks()
+            )
+            for key, values in fine_tune_history.history.items():
+                history.history.setdefault(key, []).extend(values)
         
         return history
     
@@ -4,10 +4,271 @@ Enables periodic model retraining with new fruit images.
 Supports data collection, augmentation, and incremental learning.
 """
 from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import errno
+import hashlib
+import heapq
+import importlib.util
 import os
 import json
 import shutil
+import sqlite3
+import stat
+import sys
+import tempfile
+import time
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# ioctl request for a reflink (copy-on-write) clone, from linux/fs.h
+_FICLONE = 0x40049409
+
+# Chunk sizes for the in-kernel and userspace copy loops
+_COPY_RANGE_CHUNK = 1 << 30
+_COPY_BUFFER_SIZE = 1 << 20
+
+# Concurrent copies in add_training_samples_batch
+_COPY_WORKERS = 8
+
+# Model version artifacts
+_SAVED_MODEL_DIR = 'saved_model'
+_LEGACY_MODEL_FILE = 'model.h5'
+_TFLITE_MODEL_FILE = 'model.int8.tflite'
+
+# Validated images used to calibrate int8 quantization
+_CALIBRATION_SAMPLES = 100
+
+# Sample metadata database, one row per sample
+_METADATA_DB = 'metadata.db'
+_METADATA_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS samples (
+        id TEXT PRIMARY KEY,
+        class TEXT NOT NULL,
+        verified INTEGER NOT NULL,
+        path TEXT NOT NULL,
+        added_at REAL NOT NULL,
+        meta BLOB
+    )
+"""
+
+# Last seen mtime of each class directory (the latest of it and its shard
+# directories), so stats only rescan classes changed outside the API
+_DIRECTORY_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS class_dirs (
+        verified INTEGER NOT NULL,
+        class TEXT NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        PRIMARY KEY (verified, class)
+    )
+"""
+
+# Image types packed into training shards (formats tf.io.decode_image reads)
+_IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.png', '.bmp', '.gif'})
+
+# Target TFRecord shard size and training shuffle buffer
+_SHARD_BYTES = 128 << 20
+_SHUFFLE_BUFFER = 8192
+
+# Shards read concurrently by the training input pipeline
+_INTERLEAVE_CYCLE = 64
+
+# Errors meaning a copy mechanism is unsupported for this pair of files
+_COPY_UNSUPPORTED = {errno.ENOSYS, errno.EXDEV, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTTY, errno.EBADF}
+
+# Errors meaning a hardlink can't be made, so the sample is copied instead
+_LINK_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP, errno.ENOSYS}
+
+
+def _is_image(name: str, _splitext=os.path.splitext, _extensions=_IMAGE_EXTENSIONS) -> bool:
+    """Whether a file in a class directory is a sample image (not a sidecar or stray file)"""
+    return _splitext(name)[1].lower() in _extensions
+
+
+def _bucket(sample_id: str) -> str:
+    """Two hex digit shard directory for a sample, derived from its id"""
+    return hashlib.blake2b(sample_id.encode(), digest_size=1).hexdigest()
+
+
+def _class_images(class_path: str) -> List[os.DirEntry]:
+    """
+    List the sample images in a class directory.
+    
+    Samples live in hash-prefix shard directories (<class>/<hh>/<id>);
+    images stored directly in the class directory by older versions are
+    included too.
+    """
+    images = []
+    with os.scandir(class_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                with os.scandir(entry.path) as files:
+                    images.extend(f for f in files if _is_image(f.name))
+            elif _is_image(entry.name):
+                images.append(entry)
+    return images
+
+
+def _class_mtime(class_path: str) -> int:
+    """
+    Latest mtime of a class directory and its shard directories; adding a
+    sample to an existing shard directory leaves the class directory's own
+    mtime alone.
+    """
+    mtime = os.stat(class_path).st_mtime_ns
+    with os.scandir(class_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                mtime = max(mtime, entry.stat().st_mtime_ns)
+    return mtime
+
+
+def _with_policy(tf, model, policy: str):
+    """
+    A copy of a Keras model (with its weights) whose layers use the given
+    precision policy; keras.applications models can only be built under the
+    global policy, so they are rebuilt layer by layer instead.
+    """
+    if all(layer.dtype_policy.name == policy for layer in model.layers):
+        return model
+    
+    def clone_layer(layer):
+        return layer.__class__.from_config({**layer.get_config(), 'dtype': policy})
+    
+    clone = tf.keras.models.clone_model(model, clone_function=clone_layer)
+    clone.set_weights(model.get_weights())
+    return clone
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """Serialize to JSON bytes, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, indent=2 if indent else None).encode()
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when installed"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _write_json(path: str, obj: Any) -> None:
+    """Write an indented JSON file in a single write"""
+    with open(path, 'wb') as f:
+        f.write(_dumps(obj, indent=True))
+
+
+def _read_json(path: str) -> Any:
+    """Read a JSON file"""
+    with open(path, 'rb') as f:
+        return _loads(f.read())
+
+
+def _fastcopy(src: str, dst: str) -> None:
+    """
+    Copy a file with its metadata, like shutil.copy2, using the cheapest
+    mechanism available: a reflink clone, then copy_file_range, then
+    sendfile, and finally a buffered read/write loop.
+    """
+    binary = getattr(os, 'O_BINARY', 0)
+    src_fd = os.open(src, os.O_RDONLY | binary)
+    try:
+        dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | binary, 0o666)
+        try:
+            _copy_fd(src_fd, dst_fd)
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    
+    shutil.copystat(src, dst)
+
+
+def _copy_fd(src_fd: int, dst_fd: int) -> None:
+    """Copy the contents of src_fd to dst_fd, both positioned at the start"""
+    if fcntl is not None:
+        try:
+            fcntl.ioctl(dst_fd, _FICLONE, src_fd)
+            return
+        except OSError:
+            pass
+    
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while os.copy_file_range(src_fd, dst_fd, _COPY_RANGE_CHUNK):
+                pass
+            return
+        except OSError as e:
+            if e.errno not in _COPY_UNSUPPORTED:
+                raise
+            _rewind(src_fd, dst_fd)
+    
+    if hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+        try:
+            while os.sendfile(dst_fd, src_fd, None, _COPY_BUFFER_SIZE):
+                pass
+            return
+        except OSError as e:
+            if e.errno not in _COPY_UNSUPPORTED:
+                raise
+            _rewind(src_fd, dst_fd)
+    
+    buffer = memoryview(bytearray(_COPY_BUFFER_SIZE))
+    with open(src_fd, 'rb', buffering=0, closefd=False) as src, \
+         open(dst_fd, 'wb', buffering=0, closefd=False) as dst:
+        while True:
+            n = src.readinto(buffer)
+            if not n:
+                break
+            view = buffer[:n]
+            while view:
+                view = view[dst.write(view):]
+
+
+def _move_fast(src: str, dst: str) -> None:
+    """
+    Move a file: a rename within a filesystem, otherwise a reflink clone or
+    in-kernel copy (via _fastcopy) followed by removing the source.
+    """
+    try:
+        os.rename(src, dst)
+        return
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    
+    try:
+        _fastcopy(src, dst)
+    except OSError:
+        shutil.move(src, dst)
+        return
+    os.unlink(src)
+
+
+def _find_model_file(version_dir: str) -> Optional[str]:
+    """Locate a saved model version, preferring SavedModel over legacy .h5"""
+    for name in (_SAVED_MODEL_DIR, _LEGACY_MODEL_FILE):
+        path = os.path.join(version_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _rewind(src_fd: int, dst_fd: int) -> None:
+    """Reset both files after a partially failed copy attempt"""
+    os.lseek(src_fd, 0, os.SEEK_SET)
+    os.lseek(dst_fd, 0, os.SEEK_SET)
+    os.ftruncate(dst_fd, 0)
 
 
 class ModelRetrainer:
@@ -16,14 +277,23 @@ class ModelRetrainer:
     Supports data collection, validation, and training workflows.
     """
     
-    def __init__(self, base_path: str = None):
+    # TensorFlow module, imported on first use by _tf()
+    _tf_module = None
+    
+    def __init__(self, base_path: str = None, prefer_hardlink: bool = False):
         """
         Initialize retraining module.
         
         Args:
             base_path: Base path for training data and models
+            prefer_hardlink: Store new samples as hardlinks to the source
+                             image when it is on the same filesystem. Only
+                             for sources nothing else will rewrite in place:
+                             the sample shares their data, so e.g. a secure
+                             overwrite of an upload would destroy it
         """
         self.base_path = base_path or os.path.join(os.getcwd(), 'training_data')
+        self.prefer_hardlink = prefer_hardlink
         self.new_data_path = os.path.join(self.base_path, 'new_samples')
         self.validated_path = os.path.join(self.base_path, 'validated')
         self.model_history_path = os.path.join(self.base_path, 'model_versions')
@@ -40,18 +310,132 @@ class ModelRetrainer:
             'batch_size': 32,
             'epochs': 10,
             'learning_rate': 0.0001,
-            'augmentation': True
+            'augmentation': True,
+            'mixed_precision': 'auto'
         }
         
+        self._db = self._open_metadata_db()
+        # Opening the database has just reconciled it
+        self._reconcile_on_stats = False
+        
         self._tf_available = self._check_tensorflow()
     
-    def _check_tensorflow(self) -> bool:
-        """Check if TensorFlow is available"""
+    def close(self):
+        """Close the sample metadata database"""
+        self._db.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _open_metadata_db(self) -> sqlite3.Connection:
+        """
+        Open the sample metadata database.
+        
+        WAL mode lets stats queries run while samples are being added. Samples
+        (and their .json sidecars) already on disk are indexed by
+        _reconcile_samples, here and before every later stats query.
+        """
+        db = sqlite3.connect(
+            os.path.join(self.base_path, _METADATA_DB),
+            isolation_level=None,
+            check_same_thread=False
+        )
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.execute(_METADATA_SCHEMA)
+        db.execute(_DIRECTORY_SCHEMA)
+        
+        self._reconcile_samples(db)
+        return db
+    
+    def _reconcile_samples(self, db: sqlite3.Connection) -> None:
+        """
+        Bring the samples table in line with the sample directories.
+        
+        Samples can also be added or removed on disk, outside the API, and
+        prepare_dataset trains on what is on disk. Each class directory whose
+        mtime changed since the last pass is rescanned: files missing from the
+        table are indexed (with their .json sidecars, if any) and rows whose
+        file is gone are dropped. Unchanged classes cost a few stats.
+        """
+        seen = {}
+        for root, verified in ((self.new_data_path, 0), (self.validated_path, 1)):
+            with os.scandir(root) as class_entries:
+                for class_entry in class_entries:
+                    if class_entry.is_dir(follow_symlinks=False):
+                        seen[verified, class_entry.name] = (class_entry.path, _class_mtime(class_entry.path))
+        
+        known = {
+            (verified, name): mtime
+            for verified, name, mtime in db.execute('SELECT verified, class, mtime_ns FROM class_dirs')
+        }
+        changed = [key for key, (_, mtime) in seen.items() if known.get(key) != mtime]
+        removed = [key for key in known if key not in seen]
+        if not changed and not removed:
+            return
+        
+        db.execute('BEGIN IMMEDIATE')
         try:
+            for verified, name in removed:
+                db.execute('DELETE FROM samples WHERE class = ? AND verified = ?', (name, verified))
+                db.execute('DELETE FROM class_dirs WHERE class = ? AND verified = ?', (name, verified))
+            # Index new files first, then drop rows of files that are gone, so a
+            # sample moved between classes keeps its row (and metadata)
+            files = {key: self._index_class(db, seen[key][0], *key) for key in changed}
+            for (verified, name), names in files.items():
+                db.executemany(
+                    'DELETE FROM samples WHERE id = ? AND class = ? AND verified = ?',
+                    ((sample_id, name, verified) for (sample_id,) in db.execute(
+                        'SELECT id FROM samples WHERE class = ? AND verified = ?', (name, verified)
+                    ).fetchall() if sample_id not in names)
+                )
+                db.execute(
+                    'INSERT OR REPLACE INTO class_dirs VALUES (?, ?, ?)', (verified, name, seen[verified, name][1])
+                )
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+    
+    def _index_class(self, db: sqlite3.Connection, class_path: str, verified: int, name: str) -> set:
+        """Index the files of one class directory missing from the samples table, returning their names"""
+        files = {f.name: f for f in _class_images(class_path)}
+        indexed = {
+            sample_id for (sample_id,) in
+            db.execute('SELECT id FROM samples WHERE class = ? AND verified = ?', (name, verified))
+        }
+        
+        rows = []
+        for sample_id in files.keys() - indexed:
+            f = files[sample_id]
+            try:
+                with open(f.path + '.json', 'rb') as sidecar:
+                    meta = sidecar.read()
+            except OSError:
+                meta = None
+            rows.append((sample_id, name, verified, f.path, f.stat().st_mtime, meta))
+        # A sample indexed under another class or status was moved here
+        db.executemany(
+            'INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET '
+            'class = excluded.class, verified = excluded.verified, path = excluded.path',
+            rows
+        )
+        return files.keys()
+    
+    def _check_tensorflow(self) -> bool:
+        """Check if TensorFlow is installed, without importing it"""
+        return importlib.util.find_spec('tensorflow') is not None
+    
+    @classmethod
+    def _tf(cls):
+        """Import TensorFlow on first use and share the module across instances"""
+        if cls._tf_module is None:
             import tensorflow as tf
-            return True
-        except ImportError:
-            return False
+            cls._tf_module = tf
+        return cls._tf_module
     
     def add_training_sample(
         self,
@@ -75,34 +459,118 @@ class ModelRetrainer:
         if not os.path.exists(image_path):
             return {'success': False, 'error': 'Image file not found'}
         
-        # Create class directory
-        class_dir = os.path.join(
-            self.validated_path if verified else self.new_data_path,
-            fruit_class.lower()
-        )
-        os.makedirs(class_dir, exist_ok=True)
+        new_path = self._sample_path(image_path, fruit_class, verified)
+        
+        # Link or copy image
+        self._store_image(image_path, new_path)
+        
+        return self._record_sample(image_path, new_path, fruit_class, verified, metadata)
+    
+    def add_training_samples_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Add many training samples at once, copying the images concurrently.
+        
+        Args:
+            items: Dicts of add_training_sample arguments ('image_path',
+                   'fruit_class' and optionally 'verified' and 'metadata')
         
-        # Generate unique filename
+        Returns:
+            Result of adding each sample, in order
+        """
+        results = [None] * len(items)
+        pending = []
+        taken = set()
+        
+        for i, item in enumerate(items):
+            image_path = item['image_path']
+            if not os.path.exists(image_path):
+                results[i] = {'success': False, 'error': 'Image file not found'}
+                continue
+            
+            new_path = self._sample_path(image_path, item['fruit_class'], item.get('verified', False))
+            # Samples added within the same microsecond would share a name
+            while new_path in taken:
+                new_path = self._sample_path(image_path, item['fruit_class'], item.get('verified', False))
+            taken.add(new_path)
+            pending.append((i, item, new_path))
+        
+        # The copies spend their time in the kernel with the GIL released
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(_COPY_WORKERS, len(pending))) as executor:
+                copies = [
+                    (i, item, new_path, executor.submit(self._store_image, item['image_path'], new_path))
+                    for i, item, new_path in pending
+                ]
+            
+            for i, item, new_path, copy in copies:
+                try:
+                    copy.result()
+                except OSError as e:
+                    results[i] = {'success': False, 'error': str(e)}
+                    continue
+                results[i] = self._record_sample(
+                    item['image_path'], new_path, item['fruit_class'],
+                    item.get('verified', False), item.get('metadata')
+                )
+        
+        return results
+    
+    def _store_image(self, image_path: str, new_path: str) -> None:
+        """
+        Store a sample image: a copy via _fastcopy (a reflink where the
+        filesystem supports it), or a hardlink to the source when
+        prefer_hardlink is set and linking is possible.
+        """
+        if self.prefer_hardlink:
+            try:
+                os.link(image_path, new_path)
+                return
+            except OSError as e:
+                if e.errno not in _LINK_UNSUPPORTED:
+                    raise
+        
+        _fastcopy(image_path, new_path)
+    
+    def _sample_path(self, image_path: str, fruit_class: str, verified: bool) -> str:
+        """Create the shard directory and generate a unique path for a new sample"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
         ext = os.path.splitext(image_path)[1]
-        new_filename = f"{fruit_class.lower()}_{timestamp}{ext}"
-        new_path = os.path.join(class_dir, new_filename)
+        sample_id = f"{fruit_class.lower()}_{timestamp}{ext}"
         
-        # Copy image
-        shutil.copy2(image_path, new_path)
+        shard_dir = os.path.join(
+            self.validated_path if verified else self.new_data_path,
+            fruit_class.lower(),
+            _bucket(sample_id)
+        )
+        os.makedirs(shard_dir, exist_ok=True)
+        return os.path.join(shard_dir, sample_id)
+    
+    def _record_sample(
+        self,
+        image_path: str,
+        new_path: str,
+        fruit_class: str,
+        verified: bool,
+        metadata: Optional[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Record the metadata for a stored sample and build the add result"""
+        new_filename = os.path.basename(new_path)
+        added_at = datetime.now()
         
         # Save metadata
         meta = {
             'original_path': image_path,
             'fruit_class': fruit_class,
             'verified': verified,
-            'added_at': datetime.now().isoformat(),
+            'added_at': added_at.isoformat(),
             **(metadata or {})
         }
         
-        meta_path = new_path + '.json'
-        with open(meta_path, 'w') as f:
-            json.dump(meta, f, indent=2)
+        self._db.execute(
+            'INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, ?, ?)',
+            (new_filename, fruit_class.lower(), int(verified), new_path,
+             added_at.timestamp(), _dumps(meta))
+        )
         
         return {
             'success': True,
@@ -128,40 +596,86 @@ class ModelRetrainer:
         Returns:
             Verification result
         """
-        # Search for sample in new_data_path
-        for root, dirs, files in os.walk(self.new_data_path):
-            for file in files:
-                if file == sample_id:
-                    old_path = os.path.join(root, file)
-                    
-                    # Move to validated directory with correct class
-                    new_class_dir = os.path.join(self.validated_path, correct_class.lower())
-                    os.makedirs(new_class_dir, exist_ok=True)
-                    new_path = os.path.join(new_class_dir, file)
-                    
-                    shutil.move(old_path, new_path)
-                    
-                    # Update metadata
-                    old_meta = old_path + '.json'
-                    new_meta = new_path + '.json'
-                    if os.path.exists(old_meta):
-                        with open(old_meta, 'r') as f:
-                            meta = json.load(f)
-                        meta['verified'] = True
-                        meta['verified_class'] = correct_class
-                        meta['verified_at'] = datetime.now().isoformat()
-                        with open(new_meta, 'w') as f:
-                            json.dump(meta, f, indent=2)
-                        os.remove(old_meta)
-                    
-                    return {
-                        'success': True,
-                        'message': 'Sample verified and moved to training set',
-                        'sample_id': sample_id,
-                        'class': correct_class
-                    }
+        row = self._db.execute(
+            'SELECT path FROM samples WHERE id = ? AND verified = 0', (sample_id,)
+        ).fetchone()
+        old_path = row[0] if row and os.path.isfile(row[0]) else self._find_unverified_sample(sample_id)
+        if old_path is None:
+            return {'success': False, 'error': 'Sample not found'}
+        
+        # Move to validated directory with correct class
+        new_shard_dir = os.path.join(self.validated_path, correct_class.lower(), _bucket(sample_id))
+        os.makedirs(new_shard_dir, exist_ok=True)
+        new_path = os.path.join(new_shard_dir, sample_id)
+        
+        _move_fast(old_path, new_path)
+        
+        # Update metadata; samples stored before the database existed may
+        # still carry a .json sidecar, which is folded into the row
+        row = self._db.execute('SELECT meta, added_at FROM samples WHERE id = ?', (sample_id,)).fetchone()
+        meta = _loads(row[0]) if row and row[0] else {}
+        added_at = row[1] if row else os.stat(new_path).st_mtime
+        
+        old_meta = old_path + '.json'
+        if os.path.exists(old_meta):
+            meta = {**_read_json(old_meta), **meta}
+            os.remove(old_meta)
         
-        return {'success': False, 'error': 'Sample not found'}
+        meta['verified'] = True
+        meta['verified_class'] = correct_class
+        meta['verified_at'] = datetime.now().isoformat()
+        
+        self._db.execute(
+            'INSERT OR REPLACE INTO samples VALUES (?, ?, 1, ?, ?, ?)',
+            (sample_id, correct_class.lower(), new_path, added_at, _dumps(meta))
+        )
+        
+        return {
+            'success': True,
+            'message': 'Sample verified and moved to training set',
+            'sample_id': sample_id,
+            'class': correct_class
+        }
+    
+    def _find_unverified_sample(self, sample_id: str) -> Optional[str]:
+        """Locate an unverified sample file by its id"""
+        # Ids are bare file names; anything else can't name a sample
+        if not sample_id or os.path.basename(sample_id) != sample_id or sample_id in ('.', '..'):
+            return None
+        
+        # Ids are "<class>_<date>_<time>_<microseconds><ext>", so the class
+        # directory is known up front and the shard follows from the id
+        bucket = _bucket(sample_id)
+        class_dir = os.path.join(self.new_data_path, sample_id.rsplit('_', 3)[0])
+        for candidate in (os.path.join(class_dir, bucket, sample_id), os.path.join(class_dir, sample_id)):
+            if os.path.isfile(candidate):
+                return candidate
+        
+        # Otherwise check each class directory for the file directly. Where
+        # supported the candidates are resolved relative to an open handle on
+        # the root, as os.fwalk does, instead of from the full path each time
+        root_fd = None
+        if os.stat in os.supports_dir_fd and os.scandir in os.supports_fd:
+            root_fd = os.open(self.new_data_path, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+        prefix = '' if root_fd is not None else self.new_data_path
+        try:
+            with os.scandir(self.new_data_path if root_fd is None else root_fd) as entries:
+                for entry in entries:
+                    if not entry.is_dir():
+                        continue
+                    for relative in (os.path.join(entry.name, bucket, sample_id),
+                                     os.path.join(entry.name, sample_id)):
+                        try:
+                            st = os.stat(os.path.join(prefix, relative), dir_fd=root_fd)
+                        except OSError:
+                            continue
+                        if stat.S_ISREG(st.st_mode):
+                            return os.path.join(self.new_data_path, relative)
+        finally:
+            if root_fd is not None:
+                os.close(root_fd)
+        
+        return None
     
     def get_training_data_stats(self) -> Dict[str, Any]:
         """
@@ -179,25 +693,23 @@ class ModelRetrainer:
             'ready_for_training': False
         }
         
-        # Count validated samples
-        if os.path.exists(self.validated_path):
-            for class_dir in os.listdir(self.validated_path):
-                class_path = os.path.join(self.validated_path, class_dir)
-                if os.path.isdir(class_path):
-                    count = len([f for f in os.listdir(class_path) if not f.endswith('.json')])
-                    stats['validated_samples'][class_dir] = count
-                    stats['total_validated'] += count
-                    if class_dir not in stats['classes']:
-                        stats['classes'].append(class_dir)
-        
-        # Count unverified samples
-        if os.path.exists(self.new_data_path):
-            for class_dir in os.listdir(self.new_data_path):
-                class_path = os.path.join(self.new_data_path, class_dir)
-                if os.path.isdir(class_path):
-                    count = len([f for f in os.listdir(class_path) if not f.endswith('.json')])
-                    stats['unverified_samples'][class_dir] = count
-                    stats['total_unverified'] += count
+        # Pick up samples added or removed outside the API first
+        if self._reconcile_on_stats:
+            self._reconcile_samples(self._db)
+        self._reconcile_on_stats = True
+        
+        # Count samples per class
+        counts = self._db.execute(
+            'SELECT class, verified, COUNT(*) FROM samples GROUP BY class, verified ORDER BY class'
+        )
+        for class_name, verified, count in counts:
+            if verified:
+                stats['validated_samples'][class_name] = count
+                stats['total_validated'] += count
+                stats['classes'].append(class_name)
+            else:
+                stats['unverified_samples'][class_name] = count
+                stats['total_unverified'] += count
         
         # Check if ready for training
         min_samples = self.config['min_samples_per_class']
@@ -240,58 +752,198 @@ class ModelRetrainer:
             }
         
         try:
-            from tensorflow.keras.preprocessing.image import ImageDataGenerator
-            
-            # Define augmentation
-            if augment:
-                train_datagen = ImageDataGenerator(
-                    rescale=1./255,
-                    rotation_range=20,
-                    width_shift_range=0.2,
-                    height_shift_range=0.2,
-                    shear_range=0.2,
-                    zoom_range=0.2,
-                    horizontal_flip=True,
-                    fill_mode='nearest',
-                    validation_split=self.config['validation_split']
-                )
-            else:
-                train_datagen = ImageDataGenerator(
-                    rescale=1./255,
-                    validation_split=self.config['validation_split']
-                )
+            tf = self._tf()
+            layers = tf.keras.layers
             
-            # Create generators
-            train_generator = train_datagen.flow_from_directory(
-                self.validated_path,
-                target_size=self.config['image_size'],
-                batch_size=self.config['batch_size'],
-                class_mode='categorical',
-                subset='training'
-            )
+            shards = self._materialize_tfrecords(tf)
+            num_classes = len(shards['classes'])
+            image_size = self.config['image_size']
+            autotune = tf.data.AUTOTUNE
             
-            validation_generator = train_datagen.flow_from_directory(
-                self.validated_path,
-                target_size=self.config['image_size'],
-                batch_size=self.config['batch_size'],
-                class_mode='categorical',
-                subset='validation'
-            )
+            feature_spec = {'image': tf.io.FixedLenFeature([], tf.string)}
+            
+            def parse(record, label):
+                example = tf.io.parse_single_example(record, feature_spec)
+                image = tf.io.decode_image(example['image'], channels=3, expand_animations=False)
+                image = tf.image.resize(image, image_size) / 255.0
+                return image, tf.one_hot(label, num_classes)
+            
+            # Augmentation runs as graph ops on whole batches, in float32
+            # whatever the process-wide precision policy
+            augmentation = tf.keras.Sequential([
+                layers.RandomFlip('horizontal', dtype='float32'),
+                layers.RandomRotation(20 / 360, fill_mode='nearest', dtype='float32'),
+                layers.RandomTranslation(0.2, 0.2, fill_mode='nearest', dtype='float32'),
+                layers.RandomZoom(0.2, fill_mode='nearest', dtype='float32')
+            ])
+            
+            def build(files, labels, training):
+                # Each shard holds one class; reading many shards at once
+                # mixes the classes and costs one sequential read per shard
+                shards = tf.data.Dataset.from_tensor_slices(
+                    (tf.constant(files, dtype=tf.string), tf.constant(labels, dtype=tf.int64))
+                )
+                if training:
+                    shards = shards.shuffle(max(1, len(files)))
+                dataset = shards.interleave(
+                    lambda path, label: tf.data.TFRecordDataset(path).map(lambda record: (record, label)),
+                    cycle_length=max(1, min(len(files), _INTERLEAVE_CYCLE)),
+                    num_parallel_calls=autotune,
+                    deterministic=not training
+                )
+                if training:
+                    dataset = dataset.shuffle(_SHUFFLE_BUFFER)
+                dataset = dataset.map(parse, num_parallel_calls=autotune)
+                dataset = dataset.batch(self.config['batch_size'])
+                if training and augment:
+                    dataset = dataset.map(
+                        lambda x, y: (augmentation(x, training=True), y),
+                        num_parallel_calls=autotune
+                    )
+                return dataset.prefetch(autotune)
             
             return {
                 'success': True,
-                'train_generator': train_generator,
-                'validation_generator': validation_generator,
-                'classes': list(train_generator.class_indices.keys()),
-                'num_classes': len(train_generator.class_indices),
-                'train_samples': train_generator.n,
-                'validation_samples': validation_generator.n,
+                'train_generator': build(shards['train_files'], shards['train_labels'], training=True),
+                'feature_generator': build(shards['train_files'], shards['train_labels'], training=False),
+                'validation_generator': build(
+                    shards['validation_files'], shards['validation_labels'], training=False
+                ),
+                'classes': shards['classes'],
+                'num_classes': num_classes,
+                'train_samples': shards['train_samples'],
+                'validation_samples': shards['validation_samples'],
                 'augmentation_enabled': augment
             }
             
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    def _materialize_tfrecords(self, tf) -> Dict[str, Any]:
+        """
+        Pack the validated images into per-class TFRecord shards.
+        
+        Shards are built incrementally: a class is repacked only when one of
+        its directories or the validation split changed. Classes are sorted
+        and the first validation_split of each class's files (sorted by name)
+        is held out, as flow_from_directory does.
+        
+        Returns:
+            Shard listing ('classes', 'train_files', 'train_labels',
+            'validation_files', 'validation_labels', 'train_samples',
+            'validation_samples')
+        """
+        shard_dir = os.path.join(self.base_path, 'tfrecords')
+        manifest_path = os.path.join(shard_dir, 'manifest.json')
+        os.makedirs(shard_dir, exist_ok=True)
+        
+        samples = {}
+        mtimes = {}
+        with os.scandir(self.validated_path) as class_entries:
+            for class_entry in class_entries:
+                if class_entry.is_dir(follow_symlinks=False):
+                    mtimes[class_entry.name] = _class_mtime(class_entry.path)
+                    samples[class_entry.name] = [
+                        f.path for f in sorted(_class_images(class_entry.path), key=lambda f: f.name)
+                    ]
+        classes = sorted(name for name, paths in samples.items() if paths)
+        
+        try:
+            manifest = _read_json(manifest_path)
+        except (OSError, ValueError):
+            manifest = {}
+        old_shards = manifest.get('classes', {})
+        
+        split = self.config['validation_split']
+        generation = time.time_ns()
+        shards = {}
+        for name in classes:
+            paths = samples[name]
+            signature = [split, len(paths), mtimes[name]]
+            
+            cached = old_shards.get(name)
+            if (cached and cached['signature'] == signature and
+                    all(os.path.exists(f) for f in cached['train_files'] + cached['validation_files'])):
+                shards[name] = cached
+                continue
+            
+            held_out = int(split * len(paths))
+            shards[name] = {
+                'signature': signature,
+                'train_files': self._write_shards(tf, shard_dir, f'train-{name}-{generation}', paths[held_out:]),
+                'validation_files': self._write_shards(
+                    tf, shard_dir, f'validation-{name}-{generation}', paths[:held_out]
+                ),
+                'train_samples': len(paths) - held_out,
+                'validation_samples': held_out
+            }
+        
+        if shards != old_shards:
+            tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+            _write_json(tmp_path, {'classes': shards})
+            os.replace(tmp_path, manifest_path)
+            
+            # Drop shards that are no longer listed
+            current = {f for entry in shards.values() for f in entry['train_files'] + entry['validation_files']}
+            for entry in old_shards.values():
+                for path in entry['train_files'] + entry['validation_files']:
+                    if path not in current:
+                        try:
+                            os.remove(path)
+                        except OSError:
+                            pass
+        
+        result = {
+            'classes': classes,
+            'train_files': [],
+            'train_labels': [],
+            'validation_files': [],
+            'validation_labels': [],
+            'train_samples': 0,
+            'validation_samples': 0
+        }
+        for label, name in enumerate(classes):
+            for subset in ('train', 'validation'):
+                files = shards[name][f'{subset}_files']
+                result[f'{subset}_files'].extend(files)
+                result[f'{subset}_labels'].extend([label] * len(files))
+                result[f'{subset}_samples'] += shards[name][f'{subset}_samples']
+        
+        return result
+    
+    def _write_shards(self, tf, shard_dir: str, prefix: str, paths: List[str]) -> List[str]:
+        """Write images to size-capped TFRecord shards"""
+        files = []
+        writer = None
+        shard_bytes = 0
+        
+        def close_shard():
+            writer.close()
+            # Shards only appear under their final name once complete
+            os.replace(files[-1] + '.tmp', files[-1])
+        
+        for path in paths:
+            with open(path, 'rb') as f:
+                data = f.read()
+            
+            if writer is None or shard_bytes >= _SHARD_BYTES:
+                if writer is not None:
+                    close_shard()
+                files.append(os.path.join(shard_dir, f'{prefix}-{len(files):05d}.tfrecord'))
+                writer = tf.io.TFRecordWriter(files[-1] + '.tmp')
+                shard_bytes = 0
+            
+            example = tf.train.Example(features=tf.train.Features(feature={
+                'image': tf.train.Feature(bytes_list=tf.train.BytesList(value=[data]))
+            }))
+            writer.write(example.SerializeToString())
+            shard_bytes += len(data)
+        
+        if writer is not None:
+            close_shard()
+        
+        return files
+    
     def create_model(
         self,
         num_classes: int,
@@ -315,45 +967,56 @@ class ModelRetrainer:
             }
         
         try:
-            import tensorflow as tf
-            from tensorflow.keras import layers, models
-            from tensorflow.keras.applications import MobileNetV2, ResNet50, EfficientNetB0
+            tf = self._tf()
+            layers, models = tf.keras.layers, tf.keras.models
+            applications = tf.keras.applications
             
             input_shape = (*self.config['image_size'], 3)
             
             # Select base model
             base_models = {
-                'MobileNetV2': MobileNetV2,
-                'ResNet50': ResNet50,
-                'EfficientNetB0': EfficientNetB0
+                'MobileNetV2': applications.MobileNetV2,
+                'ResNet50': applications.ResNet50,
+                'EfficientNetB0': applications.EfficientNetB0
             }
             
             if base_model not in base_models:
                 base_model = 'MobileNetV2'
             
+            # Every layer gets the precision policy explicitly rather than
+            # through the process-wide global policy, which dataset
+            # preparation on another thread may be reading at the same time
+            precision = self._precision_policy(tf)
+            
             # Create base model
-            base = base_models[base_model](
+            base = _with_policy(tf, base_models[base_model](
                 weights='imagenet',
                 include_top=False,
                 input_shape=input_shape
-            )
+            ), precision)
             
             # Freeze base layers
             base.trainable = False
             
-            # Build model
+            # Build model; the output layer stays float32 so the softmax
+            # and loss are computed at full precision
             model = models.Sequential([
                 base,
-                layers.GlobalAveragePooling2D(),
-                layers.Dropout(0.3),
-                layers.Dense(256, activation='relu'),
-                layers.Dropout(0.3),
-                layers.Dense(num_classes, activation='softmax')
+                layers.GlobalAveragePooling2D(dtype=precision),
+                layers.Dropout(0.3, dtype=precision),
+                layers.Dense(256, activation='relu', dtype=precision),
+                layers.Dropout(0.3, dtype=precision),
+                layers.Dense(num_classes, activation='softmax', dtype='float32')
             ])
             
+            optimizer = tf.keras.optimizers.Adam(learning_rate=self.config['learning_rate'])
+            if precision == 'mixed_float16':
+                # float16 gradients need loss scaling to avoid underflow
+                optimizer = tf.keras.mixed_precision.LossScaleOptimizer(optimizer)
+            
             # Compile
             model.compile(
-                optimizer=tf.keras.optimizers.Adam(learning_rate=self.config['learning_rate']),
+                optimizer=optimizer,
                 loss='categorical_crossentropy',
                 metrics=['accuracy']
             )
@@ -362,6 +1025,7 @@ class ModelRetrainer:
                 'success': True,
                 'model': model,
                 'base_model': base_model,
+                'precision_policy': precision,
                 'num_classes': num_classes,
                 'trainable_params': sum([tf.keras.backend.count_params(w) for w in model.trainable_weights]),
                 'total_params': sum([tf.keras.backend.count_params(w) for w in model.weights])
@@ -370,21 +1034,78 @@ class ModelRetrainer:
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    def _resize_output_layer(self, model_result: Dict[str, Any], num_classes: int) -> Dict[str, Any]:
+        """Replace a created model's output layer to predict num_classes classes"""
+        try:
+            tf = self._tf()
+            layers, models = tf.keras.layers, tf.keras.models
+            
+            model = model_result['model']
+            resized = models.Sequential(
+                model.layers[:-1] + [layers.Dense(num_classes, activation='softmax', dtype='float32')]
+            )
+            # The optimizer hasn't been used yet, so it carries over as is
+            resized.compile(optimizer=model.optimizer, loss=model.loss, metrics=['accuracy'])
+            
+            return {**model_result, 'model': resized, 'num_classes': num_classes}
+            
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+    
+    def _precision_policy(self, tf) -> str:
+        """
+        Pick the Keras precision policy for training.
+        
+        config['mixed_precision'] may name a policy explicitly; with 'auto',
+        TPUs and Ampere or newer GPUs use bfloat16, Volta/Turing GPUs use
+        float16 and everything else (including CPUs) stays at float32.
+        """
+        setting = self.config.get('mixed_precision', 'auto')
+        if setting != 'auto':
+            return setting or 'float32'
+        
+        if tf.config.list_logical_devices('TPU'):
+            return 'mixed_bfloat16'
+        
+        capabilities = [
+            tf.config.experimental.get_device_details(gpu).get('compute_capability') or (0, 0)
+            for gpu in tf.config.list_physical_devices('GPU')
+        ]
+        if not capabilities:
+            return 'float32'
+        if min(capabilities) >= (8, 0):
+            return 'mixed_bfloat16'
+        if min(capabilities) >= (7, 0):
+            return 'mixed_float16'
+        return 'float32'
+    
     def train_model(
         self,
         model,
         train_generator,
         validation_generator,
-        epochs: int = None
+        epochs: int = None,
+        precompute_features: bool = None,
+        feature_generator=None
     ) -> Dict[str, Any]:
         """
         Train the model on prepared data.
         
+        When the model's backbone (its first layer) is frozen, its pooled
+        output never changes between epochs; with precompute_features it is
+        computed once and only the classification head is trained on it.
+        Precomputed features are taken from unaugmented images, so this is
+        only the default when augmentation is disabled in the config.
+        
         Args:
             model: Keras model to train
             train_generator: Training data generator
             validation_generator: Validation data generator
             epochs: Number of training epochs
+            precompute_features: Train the head on cached backbone features
+                                 (defaults to not config['augmentation'])
+            feature_generator: Unaugmented training data for feature
+                               extraction (defaults to train_generator)
         
         Returns:
             Training results
@@ -393,9 +1114,11 @@ class ModelRetrainer:
             return {'success': False, 'error': 'TensorFlow required'}
         
         epochs = epochs or self.config['epochs']
+        if precompute_features is None:
+            precompute_features = not self.config['augmentation']
         
         try:
-            import tensorflow as tf
+            tf = self._tf()
             
             # Callbacks
             callbacks = [
@@ -412,44 +1135,108 @@ class ModelRetrainer:
             ]
             
             # Train
-            history = model.fit(
-                train_generator,
-                epochs=epochs,
-                validation_data=validation_generator,
-                callbacks=callbacks,
-                verbose=1
+            precompute_features = (
+                precompute_features and len(model.layers) > 2 and not model.layers[0].trainable
             )
+            if precompute_features:
+                # Backbone and pooling run once; the head layers are shared
+                # with the full model, so training them trains the model
+                extractor = tf.keras.Sequential(model.layers[:2])
+                num_classes = model.output_shape[-1]
+                
+                # A directory of its own per run, so concurrent retrains never
+                # truncate each other's feature files
+                feature_dir = tempfile.mkdtemp(prefix='features-', dir=self.base_path)
+                try:
+                    train_features, train_labels = self._extract_features(
+                        extractor, feature_generator or train_generator,
+                        os.path.join(feature_dir, 'train.f16'), num_classes
+                    )
+                    val_features, val_labels = self._extract_features(
+                        extractor, validation_generator,
+                        os.path.join(feature_dir, 'validation.f16'), num_classes
+                    )
+                    
+                    head = tf.keras.Sequential(
+                        [tf.keras.Input(shape=train_features.shape[1:])] + model.layers[2:]
+                    )
+                    head.compile(optimizer=model.optimizer, loss=model.loss, metrics=['accuracy'])
+                    
+                    batch_size = self.config['batch_size']
+                    history = head.fit(
+                        tf.data.Dataset.from_tensor_slices((train_features, train_labels))
+                        .shuffle(len(train_labels) or 1)
+                        .batch(batch_size)
+                        .prefetch(tf.data.AUTOTUNE),
+                        epochs=epochs,
+                        validation_data=tf.data.Dataset.from_tensor_slices((val_features, val_labels))
+                        .batch(batch_size),
+                        callbacks=callbacks,
+                        verbose=1
+                    )
+                finally:
+                    train_features = val_features = None
+                    shutil.rmtree(feature_dir, ignore_errors=True)
+            else:
+                history = model.fit(
+                    train_generator,
+                    epochs=epochs,
+                    validation_data=validation_generator,
+                    callbacks=callbacks,
+                    verbose=1
+                )
             
-            # Get final metrics
-            final_train_acc = history.history['accuracy'][-1]
-            final_val_acc = history.history['val_accuracy'][-1]
-            final_train_loss = history.history['loss'][-1]
-            final_val_loss = history.history['val_loss'][-1]
+            # Round all tracked metrics in one vectorized pass
+            rounded = {
+                key: np.round(np.asarray(history.history[key], dtype=np.float64), 4).tolist()
+                for key in ('accuracy', 'val_accuracy', 'loss', 'val_loss')
+            }
             
             return {
                 'success': True,
-                'epochs_completed': len(history.history['loss']),
-                'final_train_accuracy': round(final_train_acc, 4),
-                'final_val_accuracy': round(final_val_acc, 4),
-                'final_train_loss': round(final_train_loss, 4),
-                'final_val_loss': round(final_val_loss, 4),
-                'history': {
-                    'accuracy': [round(x, 4) for x in history.history['accuracy']],
-                    'val_accuracy': [round(x, 4) for x in history.history['val_accuracy']],
-                    'loss': [round(x, 4) for x in history.history['loss']],
-                    'val_loss': [round(x, 4) for x in history.history['val_loss']]
-                },
+                'epochs_completed': len(rounded['loss']),
+                'final_train_accuracy': rounded['accuracy'][-1],
+                'final_val_accuracy': rounded['val_accuracy'][-1],
+                'final_train_loss': rounded['loss'][-1],
+                'final_val_loss': rounded['val_loss'][-1],
+                'features_precomputed': precompute_features,
+                'history': rounded,
                 'model': model
             }
             
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
+    def _extract_features(self, extractor, dataset, feature_path: str,
+                          num_classes: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Run the frozen backbone once over a dataset.
+        
+        Features are streamed batch by batch to a float16 file at
+        feature_path and returned memory-mapped, with the matching labels.
+        """
+        labels = []
+        width = None
+        with open(feature_path, 'wb') as f:
+            for images, batch_labels in dataset:
+                features = np.asarray(extractor.predict_on_batch(images), dtype=np.float16)
+                width = features.shape[-1]
+                f.write(features.tobytes())
+                labels.append(np.asarray(batch_labels, dtype=np.float32))
+        
+        if width is None:
+            return (np.zeros((0, extractor.output_shape[-1]), np.float16),
+                    np.zeros((0, num_classes), np.float32))
+        
+        features = np.memmap(feature_path, dtype=np.float16, mode='r').reshape(-1, width)
+        return features, np.concatenate(labels)
+    
     def save_model(
         self,
         model,
         version: str = None,
-        metadata: Dict[str, Any] = None
+        metadata: Dict[str, Any] = None,
+        quantize: bool = True
     ) -> Dict[str, Any]:
         """
         Save trained model with versioning.
@@ -458,6 +1245,7 @@ class ModelRetrainer:
             model: Trained Keras model
             version: Version string (auto-generated if None)
             metadata: Training metadata to save
+            quantize: Also export an int8-quantized TFLite model for inference
         
         Returns:
             Save result
@@ -468,39 +1256,90 @@ class ModelRetrainer:
         version_dir = os.path.join(self.model_history_path, version)
         os.makedirs(version_dir, exist_ok=True)
         
-        model_path = os.path.join(version_dir, 'model.h5')
-        
         try:
-            model.save(model_path)
+            # SavedModel keeps the weights in a variables file TensorFlow can
+            # read without rebuilding from HDF5; .h5 is the fallback for
+            # models that can't be exported that way
+            model_path = os.path.join(version_dir, _SAVED_MODEL_DIR)
+            try:
+                model.save(model_path, save_format='tf')
+            except Exception:
+                shutil.rmtree(model_path, ignore_errors=True)
+                model_path = os.path.join(version_dir, _LEGACY_MODEL_FILE)
+                model.save(model_path)
+            
+            # The quantized export is an optional extra; a failure here leaves
+            # the saved model intact
+            tflite_path = None
+            if quantize:
+                try:
+                    tflite_path = self._export_tflite_int8(model, os.path.join(version_dir, _TFLITE_MODEL_FILE))
+                except Exception:
+                    tflite_path = None
             
             # Save metadata
             meta = {
                 'version': version,
                 'saved_at': datetime.now().isoformat(),
                 'model_path': model_path,
+                'tflite_path': tflite_path,
                 **(metadata or {})
             }
             
             meta_path = os.path.join(version_dir, 'metadata.json')
-            with open(meta_path, 'w') as f:
-                json.dump(meta, f, indent=2)
+            _write_json(meta_path, meta)
             
             return {
                 'success': True,
                 'version': version,
                 'model_path': model_path,
+                'tflite_path': tflite_path,
                 'metadata_path': meta_path
             }
             
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
-    def load_model(self, version: str) -> Dict[str, Any]:
+    def _export_tflite_int8(self, model, path: str) -> Optional[str]:
+        """
+        Write an int8-quantized TFLite copy of a model, calibrated on a
+        sample of validated images; returns the path, or None when there are
+        no images to calibrate with.
+        """
+        tf = self._tf()
+        calibration_paths = [row[0] for row in self._db.execute(
+            'SELECT path FROM samples WHERE verified = 1 ORDER BY RANDOM() LIMIT ?',
+            (_CALIBRATION_SAMPLES,)
+        ) if os.path.exists(row[0])]
+        if not calibration_paths:
+            return None
+        
+        image_size = self.config['image_size']
+        
+        def representative_dataset():
+            for image_path in calibration_paths:
+                image = tf.io.decode_image(tf.io.read_file(image_path), channels=3, expand_animations=False)
+                image = tf.image.resize(image, image_size) / 255.0
+                yield [image[tf.newaxis]]
+        
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.uint8
+        
+        with open(path, 'wb') as f:
+            f.write(converter.convert())
+        return path
+    
+    def load_model(self, version: str, inference_only: bool = False) -> Dict[str, Any]:
         """
         Load a specific model version.
         
         Args:
             version: Version string
+            inference_only: Load the int8 TFLite model as a tf.lite.Interpreter
+                            when the version has one
         
         Returns:
             Loaded model and metadata
@@ -509,57 +1348,85 @@ class ModelRetrainer:
             return {'success': False, 'error': 'TensorFlow required'}
         
         version_dir = os.path.join(self.model_history_path, version)
-        model_path = os.path.join(version_dir, 'model.h5')
-        meta_path = os.path.join(version_dir, 'metadata.json')
-        
-        if not os.path.exists(model_path):
+        use_tflite = inference_only and os.path.exists(os.path.join(version_dir, _TFLITE_MODEL_FILE))
+        if _find_model_file(version_dir) is None and not use_tflite:
             return {'success': False, 'error': f'Model version {version} not found'}
         
         try:
-            import tensorflow as tf
-            
-            model = tf.keras.models.load_model(model_path)
-            
-            metadata = {}
-            if os.path.exists(meta_path):
-                with open(meta_path, 'r') as f:
-                    metadata = json.load(f)
+            model = self._load_weights(version, use_tflite)
             
             return {
                 'success': True,
                 'model': model,
+                'format': 'tflite' if use_tflite else 'keras',
                 'version': version,
-                'metadata': metadata
+                'metadata': self._load_metadata(version)
             }
             
         except Exception as e:
             return {'success': False, 'error': str(e)}
     
-    def list_model_versions(self) -> List[Dict[str, Any]]:
-        """List all saved model versions"""
-        versions = []
+    def _load_metadata(self, version: str) -> Dict[str, Any]:
+        """Read a version's metadata without touching the model files"""
+        meta_path = os.path.join(self.model_history_path, version, 'metadata.json')
+        if os.path.exists(meta_path):
+            return _read_json(meta_path)
+        return {}
+    
+    def _load_weights(self, version: str, tflite: bool = False):
+        """Load a version's Keras model, or its int8 TFLite interpreter"""
+        tf = self._tf()
+        version_dir = os.path.join(self.model_history_path, version)
         
-        if os.path.exists(self.model_history_path):
-            for version in sorted(os.listdir(self.model_history_path), reverse=True):
-                version_dir = os.path.join(self.model_history_path, version)
-                if os.path.isdir(version_dir):
-                    meta_path = os.path.join(version_dir, 'metadata.json')
-                    metadata = {}
-                    if os.path.exists(meta_path):
-                        try:
-                            with open(meta_path, 'r') as f:
-                                metadata = json.load(f)
-                        except:
-                            pass
-                    
-                    versions.append({
-                        'version': version,
-                        'path': version_dir,
-                        'metadata': metadata
-                    })
+        if tflite:
+            interpreter = tf.lite.Interpreter(model_path=os.path.join(version_dir, _TFLITE_MODEL_FILE))
+            interpreter.allocate_tensors()
+            return interpreter
+        return tf.keras.models.load_model(_find_model_file(version_dir))
+    
+    def list_model_versions(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        List saved model versions, newest first.
+        
+        Args:
+            limit: Only list this many of the newest versions
+        """
+        names = self._version_names()
+        if limit is None:
+            names.sort(reverse=True)
+        else:
+            names = heapq.nlargest(limit, names)
+        
+        versions = []
+        for version in names:
+            version_dir = os.path.join(self.model_history_path, version)
+            meta_path = os.path.join(version_dir, 'metadata.json')
+            metadata = {}
+            if os.path.exists(meta_path):
+                try:
+                    metadata = _read_json(meta_path)
+                except:
+                    pass
+            
+            versions.append({
+                'version': version,
+                'path': version_dir,
+                'metadata': metadata
+            })
         
         return versions
     
+    def latest_version(self) -> Optional[str]:
+        """Get the newest saved model version without reading any metadata"""
+        return max(self._version_names(), default=None)
+    
+    def _version_names(self) -> List[str]:
+        """Names of the saved model version directories"""
+        if not os.path.exists(self.model_history_path):
+            return []
+        with os.scandir(self.model_history_path) as entries:
+            return [e.name for e in entries if e.is_dir()]
+    
     def compare_models(
         self,
         version1: str,
@@ -577,29 +1444,48 @@ class ModelRetrainer:
         Returns:
             Comparison results
         """
-        model1_result = self.load_model(version1)
-        model2_result = self.load_model(version2)
+        # Recorded metrics only need the metadata; models are loaded only
+        # to evaluate test data
+        for version in (version1, version2):
+            if _find_model_file(os.path.join(self.model_history_path, version)) is None:
+                return {'success': False, 'error': f'Cannot load {version}: Model version {version} not found'}
         
-        if not model1_result['success']:
-            return {'success': False, 'error': f'Cannot load {version1}: {model1_result.get("error")}'}
-        if not model2_result['success']:
-            return {'success': False, 'error': f'Cannot load {version2}: {model2_result.get("error")}'}
+        try:
+            meta1 = self._load_metadata(version1)
+            meta2 = self._load_metadata(version2)
+        except (OSError, ValueError) as e:
+            return {'success': False, 'error': f'Cannot read metadata: {e}'}
         
         comparison = {
             'version1': {
                 'version': version1,
-                'metadata': model1_result.get('metadata', {})
+                'metadata': meta1
             },
             'version2': {
                 'version': version2,
-                'metadata': model2_result.get('metadata', {})
+                'metadata': meta2
             }
         }
         
-        # Compare training metrics if available
-        meta1 = model1_result.get('metadata', {})
-        meta2 = model2_result.get('metadata', {})
+        if test_data is not None:
+            if not self._tf_available:
+                return {'success': False, 'error': 'TensorFlow required'}
+            
+            # Both evaluations read the same data; cache it after the first pass
+            if hasattr(test_data, 'cache'):
+                test_data = test_data.cache()
+            
+            try:
+                for key, version in (('version1', version1), ('version2', version2)):
+                    model = self._load_weights(version)
+                    loss, accuracy = model.evaluate(test_data, verbose=0)[:2]
+                    comparison[key]['test_loss'] = round(float(loss), 4)
+                    comparison[key]['test_accuracy'] = round(float(accuracy), 4)
+                    del model
+            except Exception as e:
+                return {'success': False, 'error': f'Evaluation failed: {e}'}
         
+        # Compare training metrics if available
         if 'final_val_accuracy' in meta1 and 'final_val_accuracy' in meta2:
             comparison['accuracy_comparison'] = {
                 'version1_accuracy': meta1['final_val_accuracy'],
@@ -615,13 +1501,13 @@ class ModelRetrainer:
     def get_retraining_status(self) -> Dict[str, Any]:
         """Get overall retraining system status"""
         stats = self.get_training_data_stats()
-        versions = self.list_model_versions()
+        versions = self._version_names()
         
         return {
             'tensorflow_available': self._tf_available,
             'data_stats': stats,
             'model_versions': len(versions),
-            'latest_version': versions[0]['version'] if versions else None,
+            'latest_version': max(versions, default=None),
             'config': self.config,
             'paths': {
                 'base': self.base_path,
@@ -648,8 +1534,16 @@ class ModelRetrainer:
         """
         results = {'steps': []}
         
-        # Step 1: Prepare dataset
-        dataset_result = self.prepare_dataset()
+        # Steps 1 and 2: dataset preparation (disk I/O) and model creation
+        # (loading the pretrained backbone) are independent, so they overlap;
+        # the class count for the model is estimated from the sample index
+        estimated_classes = self.get_training_data_stats()['classes_count']
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            dataset_future = executor.submit(self.prepare_dataset, self.config['augmentation'])
+            model_future = executor.submit(self.create_model, max(estimated_classes, 1), base_model)
+            dataset_result = dataset_future.result()
+            model_result = model_future.result()
+        
         results['steps'].append({'step': 'prepare_dataset', 'result': 'success' if dataset_result['success'] else 'failed'})
         
         if not dataset_result['success']:
@@ -657,9 +1551,10 @@ class ModelRetrainer:
             results['error'] = dataset_result.get('error')
             return results
         
-        # Step 2: Create model
         num_classes = dataset_result['num_classes']
-        model_result = self.create_model(num_classes, base_model)
+        if model_result['success'] and model_result['num_classes'] != num_classes:
+            # Only the output layer depends on the class count
+            model_result = self._resize_output_layer(model_result, num_classes)
         results['steps'].append({'step': 'create_model', 'result': 'success' if model_result['success'] else 'failed'})
         
         if not model_result['success']:
@@ -672,7 +1567,9 @@ class ModelRetrainer:
             model_result['model'],
             dataset_result['train_generator'],
             dataset_result['validation_generator'],
-            epochs
+            epochs,
+            precompute_features=not dataset_result['augmentation_enabled'],
+            feature_generator=dataset_result['feature_generator']
         )
         results['steps'].append({'step': 'train', 'result': 'success' if train_result['success'] else 'failed'})
         
@@ -2,6 +2,14 @@
 Multilingual Support Module
 Provides translations for fruit names and UI text in multiple languages
 """
+from array import array
+from functools import lru_cache
+from types import MappingProxyType
+import json
+import mmap
+import os
+import sys
+from backend.config import Config
 
 # Supported languages
 SUPPORTED_LANGUAGES = {
@@ -16,386 +24,132 @@ SUPPORTED_LANGUAGES = {
     'pt': 'Português (Portuguese)',
     'ru': 'Русский (Russian)'
 }
+SUPPORTED_LANGUAGES = {sys.intern(code): name for code, name in SUPPORTED_LANGUAGES.items()}
 
-# Fruit name translations
-FRUIT_TRANSLATIONS = {
-    'Apple': {
-        'en': 'Apple',
-        'es': 'Manzana',
-        'fr': 'Pomme',
-        'de': 'Apfel',
-        'zh': '苹果',
-        'ja': 'りんご',
-        'hi': 'सेब',
-        'ar': 'تفاحة',
-        'pt': 'Maçã',
-        'ru': 'Яблоко'
-    },
-    'Banana': {
-        'en': 'Banana',
-        'es': 'Plátano',
-        'fr': 'Banane',
-        'de': 'Banane',
-        'zh': '香蕉',
-        'ja': 'バナナ',
-        'hi': 'केला',
-        'ar': 'موز',
-        'pt': 'Banana',
-        'ru': 'Банан'
-    },
-    'Orange': {
-        'en': 'Orange',
-        'es': 'Naranja',
-        'fr': 'Orange',
-        'de': 'Orange',
-        'zh': '橙子',
-        'ja': 'オレンジ',
-        'hi': 'संतरा',
-        'ar': 'برتقال',
-        'pt': 'Laranja',
-        'ru': 'Апельсин'
-    },
-    'Mango': {
-        'en': 'Mango',
-        'es': 'Mango',
-        'fr': 'Mangue',
-        'de': 'Mango',
-        'zh': '芒果',
-        'ja': 'マンゴー',
-        'hi': 'आम',
-        'ar': 'مانجو',
-        'pt': 'Manga',
-        'ru': 'Манго'
-    },
-    'Strawberry': {
-        'en': 'Strawberry',
-        'es': 'Fresa',
-        'fr': 'Fraise',
-        'de': 'Erdbeere',
-        'zh': '草莓',
-        'ja': 'いちご',
-        'hi': 'स्ट्रॉबेरी',
-        'ar': 'فراولة',
-        'pt': 'Morango',
-        'ru': 'Клубника'
-    },
-    'Grape': {
-        'en': 'Grape',
-        'es': 'Uva',
-        'fr': 'Raisin',
-        'de': 'Traube',
-        'zh': '葡萄',
-        'ja': 'ぶどう',
-        'hi': 'अंगूर',
-        'ar': 'عنب',
-        'pt': 'Uva',
-        'ru': 'Виноград'
-    },
-    'Watermelon': {
-        'en': 'Watermelon',
-        'es': 'Sandía',
-        'fr': 'Pastèque',
-        'de': 'Wassermelone',
-        'zh': '西瓜',
-        'ja': 'スイカ',
-        'hi': 'तरबूज',
-        'ar': 'بطيخ',
-        'pt': 'Melancia',
-        'ru': 'Арбуз'
-    },
-    'Pineapple': {
-        'en': 'Pineapple',
-        'es': 'Piña',
-        'fr': 'Ananas',
-        'de': 'Ananas',
-        'zh': '菠萝',
-        'ja': 'パイナップル',
-        'hi': 'अनानास',
-        'ar': 'أناناس',
-        'pt': 'Abacaxi',
-        'ru': 'Ананас'
-    },
-    'Cherry': {
-        'en': 'Cherry',
-        'es': 'Cereza',
-        'fr': 'Cerise',
-        'de': 'Kirsche',
-        'zh': '樱桃',
-        'ja': 'さくらんぼ',
-        'hi': 'चेरी',
-        'ar': 'كرز',
-        'pt': 'Cereja',
-        'ru': 'Вишня'
-    },
-    'Kiwi': {
-        'en': 'Kiwi',
-        'es': 'Kiwi',
-        'fr': 'Kiwi',
-        'de': 'Kiwi',
-        'zh': '猕猴桃',
-        'ja': 'キウイ',
-        'hi': 'कीवी',
-        'ar': 'كيوي',
-        'pt': 'Kiwi',
-        'ru': 'Киви'
-    }
-}
+# Read-only view handed to callers, so they can't change the module's table
+_SUPPORTED_LANGUAGES_VIEW = MappingProxyType(SUPPORTED_LANGUAGES)
+
+# Translations are stored per language in locales/<language>.json as
+# {"fruits": {...}, "ui": {...}} and loaded on first use
+_LOCALES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locales')
 
-# UI Text translations
-UI_TRANSLATIONS = {
-    'title': {
-        'en': 'Fruit Classification System',
-        'es': 'Sistema de Clasificación de Frutas',
-        'fr': 'Système de Classification des Fruits',
-        'de': 'Fruchtklassifizierungssystem',
-        'zh': '水果分类系统',
-        'ja': '果物分類システム',
-        'hi': 'फल वर्गीकरण प्रणाली',
-        'ar': 'نظام تصنيف الفواكه',
-        'pt': 'Sistema de Classificação de Frutas',
-        'ru': 'Система Классификации Фруктов'
-    },
-    'classify': {
-        'en': 'Classify',
-        'es': 'Clasificar',
-        'fr': 'Classifier',
-        'de': 'Klassifizieren',
-        'zh': '分类',
-        'ja': '分類',
-        'hi': 'वर्गीकृत करें',
-        'ar': 'تصنيف',
-        'pt': 'Classificar',
-        'ru': 'Классифицировать'
-    },
-    'history': {
-        'en': 'History',
-        'es': 'Historial',
-        'fr': 'Historique',
-        'de': 'Verlauf',
-        'zh': '历史记录',
-        'ja': '履歴',
-        'hi': 'इतिहास',
-        'ar': 'السجل',
-        'pt': 'Histórico',
-        'ru': 'История'
-    },
-    'statistics': {
-        'en': 'Statistics',
-        'es': 'Estadísticas',
-        'fr': 'Statistiques',
-        'de': 'Statistiken',
-        'zh': '统计数据',
-        'ja': '統計',
-        'hi': 'आँकड़े',
-        'ar': 'إحصائيات',
-        'pt': 'Estatísticas',
-        'ru': 'Статистика'
-    },
-    'upload_image': {
-        'en': 'Upload Image',
-        'es': 'Subir Imagen',
-        'fr': 'Télécharger l\'image',
-        'de': 'Bild hochladen',
-        'zh': '上传图片',
-        'ja': '画像をアップロード',
-        'hi': 'चित्र अपलोड करें',
-        'ar': 'تحميل الصورة',
-        'pt': 'Carregar Imagem',
-        'ru': 'Загрузить изображение'
-    },
-    'confidence': {
-        'en': 'Confidence',
-        'es': 'Confianza',
-        'fr': 'Confiance',
-        'de': 'Vertrauen',
-        'zh': '置信度',
-        'ja': '信頼度',
-        'hi': 'विश्वास',
-        'ar': 'الثقة',
-        'pt': 'Confiança',
-        'ru': 'Уверенность'
-    },
-    'ripeness': {
-        'en': 'Ripeness',
-        'es': 'Madurez',
-        'fr': 'Maturité',
-        'de': 'Reife',
-        'zh': '成熟度',
-        'ja': '熟度',
-        'hi': 'पकापन',
-        'ar': 'النضج',
-        'pt': 'Maturação',
-        'ru': 'Зрелость'
-    },
-    'quality': {
-        'en': 'Quality',
-        'es': 'Calidad',
-        'fr': 'Qualité',
-        'de': 'Qualität',
-        'zh': '质量',
-        'ja': '品質',
-        'hi': 'गुणवत्ता',
-        'ar': 'الجودة',
-        'pt': 'Qualidade',
-        'ru': 'Качество'
-    },
-    'size_grade': {
-        'en': 'Size Grade',
-        'es': 'Grado de Tamaño',
-        'fr': 'Grade de Taille',
-        'de': 'Größenklasse',
-        'zh': '大小等级',
-        'ja': 'サイズ等級',
-        'hi': 'आकार ग्रेड',
-        'ar': 'درجة الحجم',
-        'pt': 'Grau de Tamanho',
-        'ru': 'Размерный класс'
-    },
-    'nutrition': {
-        'en': 'Nutrition',
-        'es': 'Nutrición',
-        'fr': 'Nutrition',
-        'de': 'Ernährung',
-        'zh': '营养',
-        'ja': '栄養',
-        'hi': 'पोषण',
-        'ar': 'التغذية',
-        'pt': 'Nutrição',
-        'ru': 'Питание'
-    },
-    'unripe': {
-        'en': 'Unripe',
-        'es': 'Verde/Inmaduro',
-        'fr': 'Non mûr',
-        'de': 'Unreif',
-        'zh': '未成熟',
-        'ja': '未熟',
-        'hi': 'कच्चा',
-        'ar': 'غير ناضج',
-        'pt': 'Verde',
-        'ru': 'Незрелый'
-    },
-    'ripe': {
-        'en': 'Ripe',
-        'es': 'Maduro',
-        'fr': 'Mûr',
-        'de': 'Reif',
-        'zh': '成熟',
-        'ja': '熟した',
-        'hi': 'पका हुआ',
-        'ar': 'ناضج',
-        'pt': 'Maduro',
-        'ru': 'Зрелый'
-    },
-    'overripe': {
-        'en': 'Overripe',
-        'es': 'Demasiado maduro',
-        'fr': 'Trop mûr',
-        'de': 'Überreif',
-        'zh': '过熟',
-        'ja': '熟し過ぎ',
-        'hi': 'अधिक पका',
-        'ar': 'مفرط النضج',
-        'pt': 'Muito maduro',
-        'ru': 'Перезрелый'
-    },
-    'healthy': {
-        'en': 'Healthy',
-        'es': 'Saludable',
-        'fr': 'Sain',
-        'de': 'Gesund',
-        'zh': '健康',
-        'ja': '健康',
-        'hi': 'स्वस्थ',
-        'ar': 'صحي',
-        'pt': 'Saudável',
-        'ru': 'Здоровый'
-    },
-    'defective': {
-        'en': 'Defective',
-        'es': 'Defectuoso',
-        'fr': 'Défectueux',
-        'de': 'Beschädigt',
-        'zh': '有缺陷',
-        'ja': '欠陥あり',
-        'hi': 'दोषपूर्ण',
-        'ar': 'معيب',
-        'pt': 'Defeituoso',
-        'ru': 'Дефектный'
-    },
-    'small': {
-        'en': 'Small',
-        'es': 'Pequeño',
-        'fr': 'Petit',
-        'de': 'Klein',
-        'zh': '小',
-        'ja': '小',
-        'hi': 'छोटा',
-        'ar': 'صغير',
-        'pt': 'Pequeno',
-        'ru': 'Маленький'
-    },
-    'medium': {
-        'en': 'Medium',
-        'es': 'Mediano',
-        'fr': 'Moyen',
-        'de': 'Mittel',
-        'zh': '中',
-        'ja': '中',
-        'hi': 'मध्यम',
-        'ar': 'متوسط',
-        'pt': 'Médio',
-        'ru': 'Средний'
-    },
-    'large': {
-        'en': 'Large',
-        'es': 'Grande',
-        'fr': 'Grand',
-        'de': 'Groß',
-        'zh': '大',
-        'ja': '大',
-        'hi': 'बड़ा',
-        'ar': 'كبير',
-        'pt': 'Grande',
-        'ru': 'Большой'
-    },
-    'calories': {
-        'en': 'Calories',
-        'es': 'Calorías',
-        'fr': 'Calories',
-        'de': 'Kalorien',
-        'zh': '卡路里',
-        'ja': 'カロリー',
-        'hi': 'कैलोरी',
-        'ar': 'السعرات الحرارية',
-        'pt': 'Calorias',
-        'ru': 'Калории'
-    },
-    'vitamins': {
-        'en': 'Vitamins',
-        'es': 'Vitaminas',
-        'fr': 'Vitamines',
-        'de': 'Vitamine',
-        'zh': '维生素',
-        'ja': 'ビタミン',
-        'hi': 'विटामिन',
-        'ar': 'الفيتامينات',
-        'pt': 'Vitaminas',
-        'ru': 'Витамины'
-    },
-    'health_benefits': {
-        'en': 'Health Benefits',
-        'es': 'Beneficios para la Salud',
-        'fr': 'Bienfaits pour la Santé',
-        'de': 'Gesundheitsvorteile',
-        'zh': '健康益处',
-        'ja': '健康効果',
-        'hi': 'स्वास्थ्य लाभ',
-        'ar': 'الفوائد الصحية',
-        'pt': 'Benefícios para a Saúde',
-        'ru': 'Польза для здоровья'
+
+def _intern_pairs(pairs):
+    """
+    Build a dict from parsed JSON pairs, interning the strings so a text
+    shared by several languages ('Kiwi', 'Banana', ...) is one object
+    """
+    return {
+        sys.intern(key): sys.intern(value) if isinstance(value, str) else value
+        for key, value in pairs
     }
-}
+
+
+def _read_locale(language):
+    """Read a language's translation file"""
+    with open(os.path.join(_LOCALES_PATH, f'{language}.json'), encoding='utf-8') as f:
+        return json.load(f, object_pairs_hook=_intern_pairs)
+
+
+# Locale to load for each supported language code; others fall back to English
+_LOCALE_CODES = {code: code for code in SUPPORTED_LANGUAGES}
+
+# English text, which defines the translation keys and their integer ids.
+# Keys are interned (by _read_locale) so lookups with literal keys match by
+# identity
+_EN = _read_locale('en')
+_FRUIT_EN = _EN['fruits']
+_UI_EN = _EN['ui']
+_FRUIT_ID = {key: i for i, key in enumerate(_FRUIT_EN)}
+_UI_ID = {key: i for i, key in enumerate(_UI_EN, len(_FRUIT_ID))}
+
+# First characters of the fruit names; other inputs can't name a fruit
+_FRUIT_INITIALS = frozenset(key[0] for key in _FRUIT_ID)
+
+
+def _pack_locale(language):
+    """
+    Pack a language's translations into the compiled locale format: the
+    number of texts n, n + 1 byte offsets into the file (native uint32s),
+    then the UTF-8 texts. Fruit names come first, then UI text; keys the
+    language has no translation for are filled with English text.
+    """
+    locale = _EN if language == 'en' else _read_locale(language)
+    texts = [
+        locale[section].get(key, english).encode('utf-8')
+        for section in ('fruits', 'ui')
+        for key, english in _EN[section].items()
+    ]
+    
+    offsets = array('I', [len(texts), (len(texts) + 2) * array('I').itemsize])
+    for text in texts:
+        offsets.append(offsets[-1] + len(text))
+    return offsets.tobytes() + b''.join(texts)
+
+
+@lru_cache(maxsize=None)
+def _load_locale(language):
+    """
+    Load a supported language's compiled translations.
+    
+    The locale is compiled to <language>.bin in Config.LOCALE_CACHE_DIR
+    (outside the package, which may be read-only) when that is missing or
+    older than its JSON (or English's, which fixes the key ids) and
+    memory-mapped, so worker processes share one copy through the page
+    cache. Where the file can't be written the packed data is kept in memory.
+    
+    Returns:
+        Tuple of (data, offsets); the text for key id i is
+        data[offsets[i]:offsets[i + 1]] decoded from UTF-8
+    """
+    path = os.path.join(Config.LOCALE_CACHE_DIR, f'{language}.bin')
+    try:
+        sources = {os.path.join(_LOCALES_PATH, f'{code}.json') for code in (language, 'en')}
+        try:
+            stale = os.stat(path).st_mtime_ns < max(os.stat(source).st_mtime_ns for source in sources)
+        except FileNotFoundError:
+            stale = True
+        
+        if stale:
+            os.makedirs(Config.LOCALE_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(_pack_locale(language))
+            os.replace(tmp_path, path)
+        
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError:
+        data = _pack_locale(language)
+    
+    itemsize = array('I').itemsize
+    count = array('I', data[:itemsize])[0]
+    return data, array('I', data[itemsize:(count + 2) * itemsize])
+
+
+def __getattr__(name):
+    """
+    Build FRUIT_TRANSLATIONS and UI_TRANSLATIONS ({key: {language: text}})
+    on first access. This loads every language.
+    
+    Every supported language is present in each inner dict, with English
+    filled in for missing translations, so translations.get(language) never
+    needs a fallback lookup.
+    """
+    sections = {'FRUIT_TRANSLATIONS': ('fruits', _FRUIT_EN), 'UI_TRANSLATIONS': ('ui', _UI_EN)}
+    if name not in sections:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    # One column of texts per language, zipped into a row per key
+    section, english = sections[name]
+    languages = tuple(SUPPORTED_LANGUAGES)
+    columns = [
+        [locale.get(key, text) for key, text in english.items()]
+        for locale in (_read_locale(language)[section] for language in languages)
+    ]
+    translations = {key: dict(zip(languages, row)) for key, row in zip(english, zip(*columns))}
+    globals()[name] = translations
+    return translations
 
 
 def get_fruit_name(fruit_class, language='en'):
@@ -409,10 +163,18 @@ def get_fruit_name(fruit_class, language='en'):
     Returns:
         Translated fruit name
     """
-    if fruit_class in FRUIT_TRANSLATIONS:
-        translations = FRUIT_TRANSLATIONS[fruit_class]
-        return translations.get(language, translations.get('en', fruit_class))
-    return fruit_class
+    if language == 'en':
+        return _FRUIT_EN.get(fruit_class, fruit_class)
+    
+    # Most unmapped names are ruled out by their first character
+    if fruit_class and fruit_class[0] not in _FRUIT_INITIALS:
+        return fruit_class
+    
+    fruit_id = _FRUIT_ID.get(fruit_class)
+    if fruit_id is None:
+        return fruit_class
+    data, offsets = _load_locale(_LOCALE_CODES.get(language, 'en'))
+    return data[offsets[fruit_id]:offsets[fruit_id + 1]].decode('utf-8')
 
 
 def get_ui_text(key, language='en'):
@@ -426,49 +188,103 @@ def get_ui_text(key, language='en'):
     Returns:
         Translated text
     """
-    if key in UI_TRANSLATIONS:
-        translations = UI_TRANSLATIONS[key]
-        return translations.get(language, translations.get('en', key))
-    return key
+    if language == 'en':
+        return _UI_EN.get(key, key)
+    
+    key_id = _UI_ID.get(key)
+    if key_id is None:
+        return key
+    data, offsets = _load_locale(_LOCALE_CODES.get(language, 'en'))
+    return data[offsets[key_id]:offsets[key_id + 1]].decode('utf-8')
 
 
 def get_supported_languages():
     """Get list of supported languages"""
-    return SUPPORTED_LANGUAGES
+    return _SUPPORTED_LANGUAGES_VIEW
+
+
+def get_ui_keys():
+    """Get the UI text keys, without loading any other language"""
+    return list(_UI_ID)
+
+
+# UI key for the casings result values arrive in ('ripe', 'Ripe', 'RIPE', ...)
+_VALUE_KEYS = {
+    variant: key
+    for key in _UI_ID
+    for variant in (key, key.capitalize(), key.title(), key.upper())
+}
+
+
+# Result fields holding UI values, translated by translate_result
+_VALUE_FIELDS = (
+    ('ripeness', 'ripeness_translated'),
+    ('quality_status', 'quality_status_translated'),
+    ('size_grade', 'size_grade_translated')
+)
+
+
+@lru_cache(maxsize=None)
+def _translator(language):
+    """
+    Build translate_result specialized to a supported language, with the
+    fruit names and result value texts resolved up front.
+    """
+    # Texts decoded from the locale are interned so each casing of a value
+    # shares one string
+    fruits = {key: sys.intern(get_fruit_name(key, language)) for key in _FRUIT_ID}
+    values = {variant: sys.intern(get_ui_text(key, language)) for variant, key in _VALUE_KEYS.items()}
+    
+    def translate(result_dict, inplace):
+        translated = result_dict if inplace else result_dict.copy()
+        get = translated.get
+        
+        value = get('predicted_class')
+        if value is not None:
+            translated['predicted_class_translated'] = fruits.get(value, value)
+        
+        for field, translated_field in _VALUE_FIELDS:
+            value = get(field)
+            if value is not None:
+                text = values.get(value)
+                translated[translated_field] = (
+                    text if text is not None else get_ui_text(value.lower(), language)
+                )
+        
+        return translated
+    
+    return translate
 
 
-def translate_result(result_dict, language='en'):
+def translate_result(result_dict, language='en', inplace=False):
     """
     Translate all translatable fields in a result dictionary
     
     Args:
         result_dict: Dictionary containing classification results
         language: Target language code
+        inplace: Add the translated fields to result_dict itself instead of
+                 a copy (for callers that own the dictionary)
         
     Returns:
         Dictionary with translated fields
     """
-    translated = result_dict.copy()
-    
-    # Translate fruit class
-    if 'predicted_class' in translated:
-        translated['predicted_class_translated'] = get_fruit_name(
-            translated['predicted_class'], language
-        )
-    
-    # Translate ripeness
-    if 'ripeness' in translated:
-        ripeness_key = translated['ripeness'].lower()
-        translated['ripeness_translated'] = get_ui_text(ripeness_key, language)
-    
-    # Translate quality
-    if 'quality_status' in translated:
-        quality_key = translated['quality_status'].lower()
-        translated['quality_status_translated'] = get_ui_text(quality_key, language)
-    
-    # Translate size grade
-    if 'size_grade' in translated:
-        size_key = translated['size_grade'].lower()
-        translated['size_grade_translated'] = get_ui_text(size_key, language)
+    return _translator(_LOCALE_CODES.get(language, 'en'))(result_dict, inplace)
+
+
+def translate_results(results, language='en', inplace=False):
+    """
+    Translate a batch of result dictionaries in one call
     
-    return translated
+    Args:
+        results: Dictionaries containing classification results
+        language: Target language code
+        inplace: Add the translated fields to each dictionary itself
+                 instead of a copy
+        
+    Returns:
+        List of dictionaries with translated fields, in order
+    """
+    # One specialized translator serves the whole batch
+    translate = _translator(_LOCALE_CODES.get(language, 'en'))
+    return [translate(result, inplace) for result in results]
@@ -2,6 +2,20 @@
 Nutritional Information Database for Fruits
 Contains comprehensive nutrition data, health benefits, storage tips, recipes and more
 """
+from typing import Any, Dict, List, Mapping, NamedTuple, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+import itertools
+import json
+import os
+import re
+import sys
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Daily recommended values for calculating percentages
 DAILY_VALUES = {
@@ -15,459 +29,289 @@ DAILY_VALUES = {
     'potassium': 3500
 }
 
-# Nutritional information per 100g serving
-NUTRITION_DATABASE = {
-    'Apple': {
-        'calories': 52,
-        'carbohydrates': 14,
-        'fiber': 2.4,
-        'sugar': 10,
-        'protein': 0.3,
-        'fat': 0.2,
-        'vitamins': {
-            'Vitamin C': '4.6mg (8% DV)',
-            'Vitamin K': '2.2μg (3% DV)',
-            'Vitamin B6': '0.04mg (2% DV)',
-            'Vitamin A': '3μg (0% DV)'
-        },
-        'minerals': {
-            'Potassium': '107mg (3% DV)',
-            'Manganese': '0.04mg (2% DV)',
-            'Phosphorus': '11mg (1% DV)'
-        },
-        'health_benefits': [
-            'Rich in antioxidants and polyphenols',
-            'Supports heart health and lowers cholesterol',
-            'High fiber promotes digestive health',
-            'May help regulate blood sugar levels',
-            'Contains quercetin which supports brain health'
-        ],
-        'glycemic_index': 36,
-        'glycemic_load': 5,
-        'gi_category': 'low',
-        'season': {
-            'peak_months': ['September', 'October', 'November'],
-            'available': 'Year-round (stored)',
-            'best_quality': 'Fall'
-        },
-        'storage': {
-            'room_temp': '1-2 weeks',
-            'refrigerated': '4-6 weeks',
-            'tips': 'Store in crisper drawer. Keep away from strong-smelling foods as apples absorb odors.',
-            'ripening': 'Store at room temperature to ripen faster'
-        },
-        'recipes': [
-            {'name': 'Apple Cinnamon Smoothie', 'ingredients': ['1 apple', '1 banana', 'cinnamon', 'almond milk', 'honey'], 'type': 'smoothie'},
-            {'name': 'Waldorf Salad', 'ingredients': ['apples', 'celery', 'walnuts', 'grapes', 'yogurt'], 'type': 'salad'},
-            {'name': 'Baked Apple Chips', 'ingredients': ['apples', 'cinnamon', 'sugar (optional)'], 'type': 'snack'}
-        ]
-    },
-    'Banana': {
-        'calories': 89,
-        'carbohydrates': 23,
-        'fiber': 2.6,
-        'sugar': 12,
-        'protein': 1.1,
-        'fat': 0.3,
-        'vitamins': {
-            'Vitamin B6': '0.37mg (22% DV)',
-            'Vitamin C': '8.7mg (15% DV)',
-            'Riboflavin': '0.07mg (4% DV)',
-            'Folate': '20μg (5% DV)'
-        },
-        'minerals': {
-            'Potassium': '358mg (10% DV)',
-            'Magnesium': '27mg (7% DV)',
-            'Manganese': '0.27mg (13% DV)'
-        },
-        'health_benefits': [
-            'Excellent source of potassium for heart health',
-            'Natural energy booster for athletes',
-            'Contains resistant starch for gut health',
-            'May improve insulin sensitivity',
-            'Supports muscle recovery after exercise'
-        ],
-        'glycemic_index': 51,
-        'glycemic_load': 13,
-        'gi_category': 'low',
-        'season': {
-            'peak_months': ['Year-round'],
-            'available': 'Year-round',
-            'best_quality': 'All seasons'
-        },
-        'storage': {
-            'room_temp': '2-7 days (depending on ripeness)',
-            'refrigerated': '1-2 weeks (skin darkens but fruit stays fresh)',
-            'tips': 'Separate from other fruits to prevent over-ripening. Freeze overripe bananas for smoothies.',
-            'ripening': 'Place in paper bag with apple to speed ripening'
-        },
-        'recipes': [
-            {'name': 'Banana Peanut Butter Smoothie', 'ingredients': ['2 bananas', 'peanut butter', 'milk', 'honey', 'ice'], 'type': 'smoothie'},
-            {'name': 'Banana Oat Pancakes', 'ingredients': ['bananas', 'oats', 'eggs', 'cinnamon'], 'type': 'breakfast'},
-            {'name': 'Frozen Banana Bites', 'ingredients': ['bananas', 'dark chocolate', 'nuts'], 'type': 'snack'}
-        ]
-    },
-    'Orange': {
-        'calories': 47,
-        'carbohydrates': 12,
-        'fiber': 2.4,
-        'sugar': 9,
-        'protein': 0.9,
-        'fat': 0.1,
-        'vitamins': {
-            'Vitamin C': '53.2mg (89% DV)',
-            'Thiamin': '0.09mg (6% DV)',
-            'Folate': '30μg (8% DV)',
-            'Vitamin A': '11μg (1% DV)'
-        },
-        'minerals': {
-            'Potassium': '181mg (5% DV)',
-            'Calcium': '40mg (4% DV)',
-            'Magnesium': '10mg (3% DV)'
-        },
-        'health_benefits': [
-            'Exceptional vitamin C for immune support',
-            'Contains flavonoids that reduce inflammation',
-            'Supports skin health and collagen production',
-            'May help prevent kidney stones',
-            'High in antioxidants for cell protection'
-        ],
-        'glycemic_index': 43,
-        'glycemic_load': 5,
-        'gi_category': 'low',
-        'season': {
-            'peak_months': ['December', 'January', 'February', 'March'],
-            'available': 'Year-round',
-            'best_quality': 'Winter'
-        },
-        'storage': {
-            'room_temp': '1 week',
-            'refrigerated': '2-3 weeks',
-            'tips': 'Store in mesh bag for air circulation. Bring to room temperature before eating for best flavor.',
-            'ripening': 'Oranges do not ripen after picking'
-        },
-        'recipes': [
-            {'name': 'Orange Creamsicle Smoothie', 'ingredients': ['2 oranges', 'vanilla yogurt', 'honey', 'ice'], 'type': 'smoothie'},
-            {'name': 'Citrus Salad', 'ingredients': ['oranges', 'grapefruit', 'mint', 'honey', 'almonds'], 'type': 'salad'},
-            {'name': 'Orange Glazed Chicken', 'ingredients': ['orange juice', 'chicken', 'garlic', 'soy sauce'], 'type': 'main'}
-        ]
-    },
-    'Mango': {
-        'calories': 60,
-        'carbohydrates': 15,
-        'fiber': 1.6,
-        'sugar': 14,
-        'protein': 0.8,
-        'fat': 0.4,
-        'vitamins': {
-            'Vitamin C': '36.4mg (61% DV)',
-            'Vitamin A': '54μg (6% DV)',
-            'Vitamin E': '0.9mg (5% DV)',
-            'Folate': '43μg (11% DV)'
-        },
-        'minerals': {
-            'Potassium': '168mg (5% DV)',
-            'Copper': '0.11mg (5% DV)',
-            'Magnesium': '10mg (3% DV)'
-        },
-        'health_benefits': [
-            'Rich in beta-carotene for eye health',
-            'Contains enzymes that aid digestion',
-            'High in antioxidants like mangiferin',
-            'Supports immune system function',
-            'May improve skin and hair health'
-        ],
-        'glycemic_index': 51,
-        'glycemic_load': 8,
-        'gi_category': 'low',
-        'season': {
-            'peak_months': ['May', 'June', 'July', 'August'],
-            'available': 'Spring to Fall',
-            'best_quality': 'Summer'
-        },
-        'storage': {
-            'room_temp': '2-5 days until ripe',
-            'refrigerated': '5-7 days (once ripe)',
-            'tips': 'Store unripe mangos at room temperature. Refrigerate only after fully ripe.',
-            'ripening': 'Place in paper bag at room temperature'
-        },
-        'recipes': [
-            {'name': 'Tropical Mango Smoothie', 'ingredients': ['1 mango', 'pineapple', 'coconut milk', 'lime'], 'type': 'smoothie'},
-            {'name': 'Mango Salsa', 'ingredients': ['mango', 'red onion', 'cilantro', 'jalapeño', 'lime'], 'type': 'sauce'},
-            {'name': 'Mango Sticky Rice', 'ingredients': ['mango', 'sticky rice', 'coconut milk', 'sugar'], 'type': 'dessert'}
-        ]
-    },
-    'Strawberry': {
-        'calories': 32,
-        'carbohydrates': 8,
-        'fiber': 2,
-        'sugar': 5,
-        'protein': 0.7,
-        'fat': 0.3,
-        'vitamins': {
-            'Vitamin C': '58.8mg (98% DV)',
-            'Folate': '24μg (6% DV)',
-            'Vitamin K': '2.2μg (3% DV)',
-            'Vitamin B6': '0.05mg (3% DV)'
-        },
-        'minerals': {
-            'Manganese': '0.39mg (19% DV)',
-            'Potassium': '153mg (4% DV)',
-            'Magnesium': '13mg (3% DV)'
-        },
-        'health_benefits': [
-            'Very high in vitamin C and antioxidants',
-            'Low glycemic index, suitable for diabetics',
-            'Contains anthocyanins for heart health',
-            'May help reduce inflammation',
-            'Supports brain health and memory'
-        ],
-        'glycemic_index': 41,
-        'glycemic_load': 3,
-        'gi_category': 'low',
-        'season': {
-            'peak_months': ['April', 'May', 'June'],
-            'available': 'Spring to Summer',
-            'best_quality': 'Late Spring'
-        },
-        'storage': {
-            'room_temp': '1-2 days',
-            'refrigerated': '3-7 days',
-            'tips': 'Do not wash until ready to eat. Store in single layer with paper towel to absorb moisture.',
-            'ripening': 'Strawberries do not ripen after picking'
-        },
-        'recipes': [
-            {'name': 'Strawberry Banana Smoothie', 'ingredients': ['strawberries', 'banana', 'yogurt', 'honey'], 'type': 'smoothie'},
-            {'name': 'Strawberry Spinach Salad', 'ingredients': ['strawberries', 'spinach', 'feta', 'pecans', 'balsamic'], 'type': 'salad'},
-            {'name': 'Chocolate Dipped Strawberries', 'ingredients': ['strawberries', 'dark chocolate', 'coconut oil'], 'type': 'dessert'}
-        ]
-    },
-    'Grape': {
-        'calories': 69,
-        'carbohydrates': 18,
-        'fiber': 0.9,
-        'sugar': 16,
-        'protein': 0.7,
-        'fat': 0.2,
-        'vitamins': {
-            'Vitamin K': '14.6μg (18% DV)',
-            'Vitamin C': '3.2mg (5% DV)',
-            'Vitamin B6': '0.09mg (5% DV)',
-            'Thiamin': '0.07mg (5% DV)'
-        },
-        'minerals': {
-            'Potassium': '191mg (5% DV)',
-            'Copper': '0.13mg (6% DV)',
-            'Manganese': '0.07mg (4% DV)'
-        },
-        'health_benefits': [
-            'Contains resveratrol for heart health',
-            'Rich in polyphenols and antioxidants',
-            'May support healthy blood pressure',
-            'Contains compounds that protect eye health',
-            'Supports healthy aging'
-        ],
-        'glycemic_index': 59,
-        'glycemic_load': 11,
-        'gi_category': 'medium',
-        'season': {
-            'peak_months': ['August', 'September', 'October'],
-            'available': 'Summer to Fall',
-            'best_quality': 'Early Fall'
-        },
-        'storage': {
-            'room_temp': '1-2 days',
-            'refrigerated': '1-2 weeks',
-            'tips': 'Store unwashed in perforated bag. Wash just before eating.',
-            'ripening': 'Grapes do not ripen after picking'
-        },
-        'recipes': [
-            {'name': 'Green Grape Smoothie', 'ingredients': ['green grapes', 'spinach', 'banana', 'almond milk'], 'type': 'smoothie'},
-            {'name': 'Chicken Salad with Grapes', 'ingredients': ['chicken', 'grapes', 'celery', 'mayo', 'walnuts'], 'type': 'salad'},
-            {'name': 'Frozen Grape Popsicles', 'ingredients': ['grapes', 'yogurt', 'honey'], 'type': 'snack'}
-        ]
-    },
-    'Watermelon': {
-        'calories': 30,
-        'carbohydrates': 8,
-        'fiber': 0.4,
-        'sugar': 6,
-        'protein': 0.6,
-        'fat': 0.2,
-        'vitamins': {
-            'Vitamin C': '8.1mg (14% DV)',
-            'Vitamin A': '28μg (3% DV)',
-            'Vitamin B6': '0.05mg (3% DV)',
-            'Vitamin B5': '0.22mg (2% DV)'
-        },
-        'minerals': {
-            'Potassium': '112mg (3% DV)',
-            'Magnesium': '10mg (3% DV)',
-            'Phosphorus': '11mg (1% DV)'
-        },
-        'health_benefits': [
-            'Excellent hydration (92% water content)',
-            'Contains lycopene for heart and prostate health',
-            'May reduce muscle soreness after exercise',
-            'Low calorie option for weight management',
-            'Contains citrulline for blood flow'
-        ],
-        'glycemic_index': 76,
-        'glycemic_load': 4,
-        'gi_category': 'high',
-        'season': {
-            'peak_months': ['June', 'July', 'August'],
-            'available': 'Summer',
-            'best_quality': 'Mid-Summer'
-        },
-        'storage': {
-            'room_temp': '7-10 days (whole)',
-            'refrigerated': '3-5 days (cut)',
-            'tips': 'Store whole watermelon at room temperature. Once cut, wrap tightly and refrigerate.',
-            'ripening': 'Watermelons do not ripen after picking'
-        },
-        'recipes': [
-            {'name': 'Watermelon Mint Cooler', 'ingredients': ['watermelon', 'mint', 'lime', 'sparkling water'], 'type': 'drink'},
-            {'name': 'Watermelon Feta Salad', 'ingredients': ['watermelon', 'feta cheese', 'mint', 'olive oil', 'balsamic'], 'type': 'salad'},
-            {'name': 'Frozen Watermelon Pops', 'ingredients': ['watermelon', 'lime juice', 'honey'], 'type': 'snack'}
-        ]
-    },
-    'Pineapple': {
-        'calories': 50,
-        'carbohydrates': 13,
-        'fiber': 1.4,
-        'sugar': 10,
-        'protein': 0.5,
-        'fat': 0.1,
-        'vitamins': {
-            'Vitamin C': '47.8mg (80% DV)',
-            'Vitamin B6': '0.11mg (6% DV)',
-            'Thiamin': '0.08mg (5% DV)',
-            'Folate': '18μg (5% DV)'
-        },
-        'minerals': {
-            'Manganese': '0.93mg (46% DV)',
-            'Copper': '0.11mg (5% DV)',
-            'Potassium': '109mg (3% DV)'
-        },
-        'health_benefits': [
-            'Contains bromelain enzyme for digestion',
-            'Anti-inflammatory properties',
-            'Very high in manganese for bone health',
-            'Supports post-surgery healing',
-            'May boost immune system'
-        ],
-        'glycemic_index': 59,
-        'glycemic_load': 7,
-        'gi_category': 'medium',
-        'season': {
-            'peak_months': ['March', 'April', 'May', 'June', 'July'],
-            'available': 'Year-round',
-            'best_quality': 'Spring to Summer'
-        },
-        'storage': {
-            'room_temp': '1-2 days (whole, ripe)',
-            'refrigerated': '3-5 days (cut)',
-            'tips': 'A ripe pineapple should smell sweet at the base. Store upside down to distribute sugars.',
-            'ripening': 'Let sit at room temperature to soften (sugars won\'t increase)'
-        },
-        'recipes': [
-            {'name': 'Piña Colada Smoothie', 'ingredients': ['pineapple', 'coconut milk', 'banana', 'ice'], 'type': 'smoothie'},
-            {'name': 'Grilled Pineapple', 'ingredients': ['pineapple', 'brown sugar', 'cinnamon', 'butter'], 'type': 'dessert'},
-            {'name': 'Hawaiian Poke Bowl', 'ingredients': ['pineapple', 'rice', 'fish', 'avocado', 'soy sauce'], 'type': 'main'}
-        ]
-    },
-    'Cherry': {
-        'calories': 63,
-        'carbohydrates': 16,
-        'fiber': 2.1,
-        'sugar': 13,
-        'protein': 1.1,
-        'fat': 0.2,
-        'vitamins': {
-            'Vitamin C': '7mg (12% DV)',
-            'Vitamin A': '3μg (0% DV)',
-            'Vitamin K': '2.1μg (3% DV)',
-            'Potassium': '222mg (6% DV)'
-        },
-        'minerals': {
-            'Potassium': '222mg (6% DV)',
-            'Copper': '0.06mg (3% DV)',
-            'Manganese': '0.07mg (4% DV)'
-        },
-        'health_benefits': [
-            'Rich in anthocyanins for inflammation',
-            'May improve sleep quality (natural melatonin)',
-            'Contains compounds that reduce gout attacks',
-            'Supports post-workout muscle recovery',
-            'May help reduce arthritis symptoms'
-        ],
-        'glycemic_index': 22,
-        'glycemic_load': 4,
-        'gi_category': 'low',
-        'season': {
-            'peak_months': ['May', 'June', 'July', 'August'],
-            'available': 'Late Spring to Summer',
-            'best_quality': 'Early Summer'
-        },
-        'storage': {
-            'room_temp': '1-2 days',
-            'refrigerated': '5-10 days',
-            'tips': 'Store unwashed with stems attached. Keep in shallow container to prevent crushing.',
-            'ripening': 'Cherries do not ripen after picking'
-        },
-        'recipes': [
-            {'name': 'Cherry Almond Smoothie', 'ingredients': ['cherries', 'almond milk', 'vanilla', 'honey'], 'type': 'smoothie'},
-            {'name': 'Cherry Compote', 'ingredients': ['cherries', 'sugar', 'lemon zest', 'vanilla'], 'type': 'sauce'},
-            {'name': 'Black Forest Parfait', 'ingredients': ['cherries', 'chocolate', 'whipped cream', 'cake'], 'type': 'dessert'}
-        ]
-    },
-    'Kiwi': {
-        'calories': 61,
-        'carbohydrates': 15,
-        'fiber': 3,
-        'sugar': 9,
-        'protein': 1.1,
-        'fat': 0.5,
-        'vitamins': {
-            'Vitamin C': '92.7mg (155% DV)',
-            'Vitamin K': '40.3μg (50% DV)',
-            'Vitamin E': '1.5mg (7% DV)',
-            'Folate': '25μg (6% DV)'
-        },
-        'minerals': {
-            'Potassium': '312mg (9% DV)',
-            'Copper': '0.13mg (6% DV)',
-            'Magnesium': '17mg (4% DV)'
-        },
-        'health_benefits': [
-            'Exceptionally high in Vitamin C',
-            'Contains actinidin enzyme for protein digestion',
-            'Supports respiratory health',
-            'May improve sleep quality',
-            'High fiber for digestive health'
+# Nutritional information per 100g serving, loaded on first use
+_DATABASE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nutrition.json')
+
+# Nutrients accepted by search_by_nutrient, mapped to their database field
+_NUTRIENT_FIELDS = {
+    'calories': 'calories',
+    'fiber': 'fiber',
+    'sugar': 'sugar',
+    'protein': 'protein',
+    'carbs': 'carbohydrates',
+    'fat': 'fat'
+}
+
+# Per 100g amounts scaled by calculate_serving; the first five also get a
+# percentage of their daily value
+_SERVING_FIELDS = ('calories', 'carbohydrates', 'fiber', 'sugar', 'protein', 'fat')
+_DAILY_VALUE_FIELDS = _SERVING_FIELDS[:5]
+_DAILY_VALUE_AMOUNTS = tuple(float(DAILY_VALUES[field]) for field in _DAILY_VALUE_FIELDS)
+_DAILY_VALUE_VECTOR = np.array(_DAILY_VALUE_AMOUNTS, dtype=np.float64)
+
+# Vitamin and mineral amounts are stored for display, e.g. '4.6mg (8% DV)'
+_AMOUNT_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(\D+?)\s*\((\d+)% DV\)')
+
+
+class _Tables(NamedTuple):
+    """The database and the lookup tables derived from it"""
+    database: Mapping[str, Mapping[str, Any]]
+    fruit_names: Tuple[str, ...]
+    rankings: Dict[Tuple[str, bool], List[Tuple[str, Any]]]
+    compare: Dict[str, Mapping[str, Any]]
+    compare_array: np.ndarray
+    low_gi: tuple
+    seasonal: tuple
+    months: Dict[str, tuple]
+    year_round: tuple
+    nutrient_rows: Dict[str, int]
+    nutrient_matrix: np.ndarray
+    nutrient_values: Dict[str, Tuple[float, ...]]
+    micronutrients: Dict[str, Mapping[str, Mapping[str, Tuple[float, str, int]]]]
+    aliases: Dict[str, str]
+    key_vitamins: Dict[str, Tuple[str, ...]]
+    recipes: Dict[str, Dict[Any, tuple]]
+
+
+def _load_database():
+    """Read the database, read-only with interned strings and shared sub-dicts"""
+    with open(_DATABASE_PATH, 'rb') as f:
+        data = f.read()
+    database = orjson.loads(data) if orjson is not None else json.loads(data)
+    pool = {}
+    return MappingProxyType({
+        sys.intern(fruit): _pooled(info, pool) for fruit, info in database.items()
+    })
+
+
+def _pooled(value, pool):
+    """
+    value with its strings interned and its dicts made read-only, where equal
+    dicts (e.g. the same season or storage details) become one shared object
+    """
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return [_pooled(item, pool) for item in value]
+    if isinstance(value, dict):
+        items = {sys.intern(key): _pooled(item, pool) for key, item in value.items()}
+        return pool.setdefault(_pool_key(items), MappingProxyType(items))
+    return value
+
+
+def _pool_key(value):
+    """Hashable stand-in for an already pooled value, equal only for equal values"""
+    if isinstance(value, MappingProxyType):
+        # Its own contents are pooled, so equal dicts are the same object
+        return 'dict', id(value)
+    if isinstance(value, dict):
+        return 'dict', tuple((key, _pool_key(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return 'list', tuple(_pool_key(item) for item in value)
+    # The type keeps 1, 1.0 and True apart
+    return type(value), value
+
+
+def _normalize_name(name):
+    """Case-, spacing- and plural-insensitive form of a fruit name ('Strawberries' -> 'strawberry')"""
+    name = ' '.join(name.lower().split())
+    if name.endswith('ies'):
+        return name[:-3] + 'y'
+    if name.endswith('oes'):
+        return name[:-2]
+    if name.endswith('s') and not name.endswith('ss'):
+        return name[:-1]
+    return name
+
+
+def _parse_amount(text):
+    """(amount, unit, daily value percentage) from a display string like '4.6mg (8% DV)'"""
+    match = _AMOUNT_PATTERN.fullmatch(text)
+    if match is None:
+        return None
+    amount, unit, daily_value = match.groups()
+    return float(amount), sys.intern(unit), int(daily_value)
+
+
+def _micronutrients(info):
+    """The vitamins and minerals of a fruit as parsed (amount, unit, % DV) records"""
+    return MappingProxyType({
+        group: MappingProxyType({
+            name: _parse_amount(text) for name, text in info.get(group, {}).items()
+        })
+        for group in ('vitamins', 'minerals')
+    })
+
+
+def _compare_array(database, micronutrients):
+    """
+    The numeric compare_fruits fields as a structured array, one record per
+    fruit; vitamin C and potassium are in mg, with NaN where a value is
+    missing (as are GI values that are not numbers)
+    """
+    def milligrams(fruit, group, name):
+        record = micronutrients[fruit][group].get(name)
+        return record[0] if record is not None and record[1] == 'mg' else np.nan
+    
+    def number(value):
+        return value if isinstance(value, (int, float)) else np.nan
+    
+    width = max((len(fruit) for fruit in database), default=1)
+    dtype = [('fruit', f'U{width}')] + [(field, 'f8') for field in _SERVING_FIELDS] + [
+        ('glycemic_index', 'f8'), ('vitamin_c', 'f8'), ('potassium', 'f8')
+    ]
+    return np.array(
+        [
+            (fruit, *(info[field] for field in _SERVING_FIELDS),
+             number(info.get('glycemic_index')),
+             milligrams(fruit, 'vitamins', 'Vitamin C'),
+             milligrams(fruit, 'minerals', 'Potassium'))
+            for fruit, info in database.items()
         ],
-        'glycemic_index': 50,
-        'glycemic_load': 7,
-        'gi_category': 'low',
-        'season': {
-            'peak_months': ['November', 'December', 'January', 'February', 'March'],
-            'available': 'Year-round',
-            'best_quality': 'Winter'
-        },
-        'storage': {
-            'room_temp': '3-5 days (until ripe)',
-            'refrigerated': '1-2 weeks (once ripe)',
-            'tips': 'Firm kiwis can be ripened at room temperature. Ripe kiwis yield to gentle pressure.',
-            'ripening': 'Place in paper bag with banana or apple'
-        },
-        'recipes': [
-            {'name': 'Kiwi Green Smoothie', 'ingredients': ['2 kiwis', 'spinach', 'banana', 'coconut water'], 'type': 'smoothie'},
-            {'name': 'Tropical Fruit Salad', 'ingredients': ['kiwi', 'mango', 'pineapple', 'coconut', 'lime'], 'type': 'salad'},
-            {'name': 'Kiwi Pavlova', 'ingredients': ['kiwi', 'meringue', 'whipped cream', 'passion fruit'], 'type': 'dessert'}
-        ]
+        dtype=dtype
+    )
+
+
+def _recipe_index(recipes):
+    """A fruit's recipes grouped by type, with all of them under None"""
+    by_type = {}
+    for recipe in recipes:
+        by_type.setdefault(recipe.get('type'), []).append(recipe)
+    by_type.pop(None, None)
+    return {None: tuple(recipes), **{kind: tuple(group) for kind, group in by_type.items()}}
+
+
+def _ranking(fruit_names, values, highest_first):
+    """(fruit, value) records in rank order of a column, ties in database order"""
+    column = np.array(values, dtype=np.float64)
+    order = np.argsort(-column if highest_first else column, kind='stable').tolist()
+    return [(fruit_names[i], values[i]) for i in order]
+
+
+def _month_index(database):
+    """
+    Map each month named in a peak_months list to the fruits in season then
+    (its own peak fruits plus year-round ones, in database order), along
+    with the year-round fruits alone for every other month.
+    """
+    records = [
+        (
+            info.get('season', {}).get('peak_months', []),
+            MappingProxyType({
+                'fruit': fruit,
+                'peak_months': info.get('season', {}).get('peak_months', []),
+                'best_quality': info.get('season', {}).get('best_quality', 'N/A')
+            })
+        )
+        for fruit, info in database.items()
+    ]
+    months = {month for peak_months, _ in records for month in peak_months}
+    index = {
+        month: tuple(
+            record for peak_months, record in records
+            if month in peak_months or 'Year-round' in peak_months
+        )
+        for month in months
     }
-}
+    year_round = tuple(record for peak_months, record in records if 'Year-round' in peak_months)
+    return index, year_round
+
+
+@lru_cache(maxsize=1)
+def _tables():
+    """
+    Load the database and build its lookup tables on first use.
+    
+    The database is static, so everything derived from it is computed once:
+    - the searchable nutrients ranked by value (search_by_nutrient only
+      slices these)
+    - the records returned by compare_fruits, get_low_gi_fruits and
+      get_seasonal_fruits (shared, so read-only), and the numeric comparison
+      array sliced by compare_fruits_array
+    - the serving nutrients as a matrix with one row per fruit for
+      calculate_servings_batch and as plain tuples for calculate_serving
+    - the vitamin and mineral strings parsed into numbers, and the first
+      three vitamins of each fruit
+    - the normalized fruit names get_nutrition_info falls back to
+    - each fruit's recipes grouped by type for get_recipes
+    """
+    database = _load_database()
+    
+    fruit_names = tuple(database)
+    # Searchable nutrients as columns, only needed to build the rankings
+    columns = {
+        field: [info.get(field, 0) for info in database.values()]
+        for field in _NUTRIENT_FIELDS.values()
+    }
+    months, year_round = _month_index(database)
+    micronutrients = {fruit: _micronutrients(info) for fruit, info in database.items()}
+    nutrient_matrix = np.array(
+        [[info[field] for field in _SERVING_FIELDS] for info in database.values()],
+        dtype=np.float64
+    )
+    
+    return _Tables(
+        database=database,
+        fruit_names=fruit_names,
+        rankings={
+            (field, highest_first): _ranking(fruit_names, values, highest_first)
+            for field, values in columns.items()
+            for highest_first in (True, False)
+        },
+        compare={
+            fruit: MappingProxyType({
+                'calories': info['calories'],
+                'carbohydrates': info['carbohydrates'],
+                'fiber': info['fiber'],
+                'sugar': info['sugar'],
+                'protein': info['protein'],
+                'fat': info['fat'],
+                'glycemic_index': info.get('glycemic_index', 'N/A'),
+                'gi_category': info.get('gi_category', 'N/A'),
+                'vitamin_c': info['vitamins'].get('Vitamin C', 'N/A'),
+                'potassium': info['minerals'].get('Potassium', 'N/A')
+            })
+            for fruit, info in database.items()
+        },
+        compare_array=_compare_array(database, micronutrients),
+        low_gi=tuple(
+            MappingProxyType({
+                'fruit': fruit,
+                'gi': info.get('glycemic_index', 'N/A'),
+                'category': info.get('gi_category', 'N/A')
+            })
+            for fruit, info in database.items()
+            if info.get('gi_category') == 'low'
+        ),
+        seasonal=tuple(
+            MappingProxyType({
+                'fruit': fruit,
+                'peak_months': info.get('season', {}).get('peak_months', []),
+                'available': info.get('season', {}).get('available', 'N/A'),
+                'best_quality': info.get('season', {}).get('best_quality', 'N/A')
+            })
+            for fruit, info in database.items()
+        ),
+        months=months,
+        year_round=year_round,
+        nutrient_rows={fruit: i for i, fruit in enumerate(fruit_names)},
+        nutrient_matrix=nutrient_matrix,
+        nutrient_values=dict(zip(fruit_names, map(tuple, nutrient_matrix.tolist()))),
+        micronutrients=micronutrients,
+        aliases={_normalize_name(fruit): fruit for fruit in fruit_names},
+        key_vitamins={
+            fruit: tuple(itertools.islice(info.get('vitamins', {}), 3))
+            for fruit, info in database.items()
+        },
+        recipes={fruit: _recipe_index(info.get('recipes', [])) for fruit, info in database.items()}
+    )
+
+
+def __getattr__(name):
+    """Load NUTRITION_DATABASE on first access"""
+    if name == 'NUTRITION_DATABASE':
+        return _tables().database
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_nutrition_info(fruit_class):
@@ -480,14 +324,42 @@ def get_nutrition_info(fruit_class):
     Returns:
         Dictionary with nutritional information or None if not found
     """
-    return NUTRITION_DATABASE.get(fruit_class, None)
+    tables = _tables()
+    info = tables.database.get(fruit_class)
+    if info is None and isinstance(fruit_class, str):
+        # Near matches such as 'apple' or 'Strawberries'
+        fruit = tables.aliases.get(_normalize_name(fruit_class))
+        if fruit is not None:
+            info = tables.database[fruit]
+    return info
+
+
+def get_nutrition_database():
+    """Get nutritional information for all fruits"""
+    return _tables().database
 
 
 def get_all_fruits():
     """Get list of all fruits in the database"""
-    return list(NUTRITION_DATABASE.keys())
+    return _tables().fruit_names
+
+
+def get_micronutrients(fruit_class):
+    """
+    Get the vitamins and minerals of a fruit as numbers
+    
+    Args:
+        fruit_class: Name of the fruit
+        
+    Returns:
+        {'vitamins': {...}, 'minerals': {...}} mapping each nutrient to an
+        (amount, unit, daily value percentage) tuple, e.g. (4.6, 'mg', 8),
+        or None if not found
+    """
+    return _tables().micronutrients.get(fruit_class)
 
 
+@lru_cache(maxsize=512)
 def get_nutrition_summary(fruit_class):
     """
     Get a simplified nutrition summary for display
@@ -498,19 +370,42 @@ def get_nutrition_summary(fruit_class):
     Returns:
         Dictionary with key nutrition highlights
     """
-    info = NUTRITION_DATABASE.get(fruit_class)
+    tables = _tables()
+    info = tables.database.get(fruit_class)
     if not info:
         return None
     
-    return {
+    # Cached, so returned read-only
+    return MappingProxyType({
         'calories': info['calories'],
         'carbs': info['carbohydrates'],
         'fiber': info['fiber'],
         'sugar': info['sugar'],
         'protein': info['protein'],
-        'key_vitamins': list(info['vitamins'].keys())[:3],
+        'key_vitamins': tables.key_vitamins[fruit_class],
         'top_benefit': info['health_benefits'][0] if info['health_benefits'] else None
-    }
+    })
+
+
+@lru_cache(maxsize=512)
+def get_nutrition_summary_json(fruit_class):
+    """
+    Get the nutrition summary already serialized, for returning as a response
+    body as-is
+    
+    Args:
+        fruit_class: Name of the fruit
+        
+    Returns:
+        Compact UTF-8 JSON bytes or None if not found
+    """
+    summary = get_nutrition_summary(fruit_class)
+    if summary is None:
+        return None
+    
+    if orjson is not None:
+        return orjson.dumps(dict(summary))
+    return json.dumps(dict(summary), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
 
 
 def compare_fruits(fruit_list):
@@ -523,23 +418,22 @@ def compare_fruits(fruit_list):
     Returns:
         Dictionary with comparison data
     """
-    comparison = {}
-    for fruit in fruit_list:
-        info = NUTRITION_DATABASE.get(fruit)
-        if info:
-            comparison[fruit] = {
-                'calories': info['calories'],
-                'carbohydrates': info['carbohydrates'],
-                'fiber': info['fiber'],
-                'sugar': info['sugar'],
-                'protein': info['protein'],
-                'fat': info['fat'],
-                'glycemic_index': info.get('glycemic_index', 'N/A'),
-                'gi_category': info.get('gi_category', 'N/A'),
-                'vitamin_c': info['vitamins'].get('Vitamin C', 'N/A'),
-                'potassium': info['minerals'].get('Potassium', 'N/A')
-            }
-    return comparison
+    compare = _tables().compare
+    return {fruit: compare[fruit] for fruit in fruit_list if fruit in compare}
+
+
+def compare_fruits_array(fruit_list):
+    """
+    Compare multiple fruits as numbers, e.g. for charting
+    
+    Args:
+        fruit_list: List of fruit names to compare
+        
+    Returns:
+        Structured NumPy array with a record per known fruit, in database order
+    """
+    compare_array = _tables().compare_array
+    return compare_array[np.isin(compare_array['fruit'], list(fruit_list))]
 
 
 def search_by_nutrient(nutrient, criteria='high', limit=5):
@@ -554,39 +448,20 @@ def search_by_nutrient(nutrient, criteria='high', limit=5):
     Returns:
         List of fruits sorted by nutrient content
     """
-    nutrient_map = {
-        'calories': 'calories',
-        'fiber': 'fiber',
-        'sugar': 'sugar',
-        'protein': 'protein',
-        'carbs': 'carbohydrates',
-        'fat': 'fat'
-    }
-    
-    if nutrient not in nutrient_map:
+    field = _NUTRIENT_FIELDS.get(nutrient)
+    if field is None:
         return []
     
-    results = []
-    for fruit, info in NUTRITION_DATABASE.items():
-        value = info.get(nutrient_map[nutrient], 0)
-        results.append({
-            'fruit': fruit,
-            'value': value,
-            'unit': 'g' if nutrient != 'calories' else 'kcal'
-        })
-    
-    reverse = criteria == 'high'
-    results.sort(key=lambda x: x['value'], reverse=reverse)
-    return results[:limit]
+    unit = 'g' if nutrient != 'calories' else 'kcal'
+    return [
+        {'fruit': fruit, 'value': value, 'unit': unit}
+        for fruit, value in _tables().rankings[field, criteria == 'high'][:limit]
+    ]
 
 
 def get_low_gi_fruits():
-    """Get all fruits with low glycemic index"""
-    return [
-        {'fruit': fruit, 'gi': info.get('glycemic_index', 'N/A'), 'category': info.get('gi_category', 'N/A')}
-        for fruit, info in NUTRITION_DATABASE.items()
-        if info.get('gi_category') == 'low'
-    ]
+    """Get all fruits with low glycemic index (shared, so returned as a tuple)"""
+    return _tables().low_gi
 
 
 def get_seasonal_fruits(month=None):
@@ -599,27 +474,11 @@ def get_seasonal_fruits(month=None):
     Returns:
         List of fruits in season
     """
-    results = []
-    for fruit, info in NUTRITION_DATABASE.items():
-        season = info.get('season', {})
-        peak_months = season.get('peak_months', [])
-        
-        if month:
-            if month in peak_months or 'Year-round' in peak_months:
-                results.append({
-                    'fruit': fruit,
-                    'peak_months': peak_months,
-                    'best_quality': season.get('best_quality', 'N/A')
-                })
-        else:
-            results.append({
-                'fruit': fruit,
-                'peak_months': peak_months,
-                'available': season.get('available', 'N/A'),
-                'best_quality': season.get('best_quality', 'N/A')
-            })
+    tables = _tables()
+    if not month:
+        return list(tables.seasonal)
     
-    return results
+    return list(tables.months.get(month, tables.year_round))
 
 
 def calculate_serving(fruit_class, grams=100):
@@ -633,26 +492,58 @@ def calculate_serving(fruit_class, grams=100):
     Returns:
         Adjusted nutrition values
     """
-    info = NUTRITION_DATABASE.get(fruit_class)
-    if not info:
+    nutrients = _tables().nutrient_values.get(fruit_class)
+    if nutrients is None:
         return None
     
+    # Six values are too few for NumPy to pay off its per-call dispatch, so a
+    # single serving is scaled in plain floats, the same operations and
+    # results as calculate_servings_batch
     multiplier = grams / 100
+    scaled = [value * multiplier for value in nutrients]
+    daily_values = [value / amount * 100 for value, amount in zip(scaled, _DAILY_VALUE_AMOUNTS)]
+    return _serving(grams, scaled, daily_values)
+
+
+def calculate_servings_batch(fruit_classes, grams=100):
+    """
+    Calculate nutrition for many custom servings at once
+    
+    Args:
+        fruit_classes: Names of fruits
+        grams: Serving size in grams, for every fruit or one per fruit
+        
+    Returns:
+        Adjusted nutrition values for each fruit (None if not found), in order
+    """
+    tables = _tables()
+    rows = [tables.nutrient_rows.get(fruit_class) for fruit_class in fruit_classes]
+    sizes = [grams] * len(rows) if np.ndim(grams) == 0 else list(grams)
+    
+    results = [None] * len(rows)
+    found = [i for i, row in enumerate(rows) if row is not None]
+    if not found:
+        return results
+    
+    # Scale every serving in one pass over the stacked nutrient rows
+    multipliers = np.array([sizes[i] for i in found], dtype=np.float64) / 100
+    scaled = tables.nutrient_matrix[[rows[i] for i in found]] * multipliers[:, np.newaxis]
+    daily_values = scaled[:, :len(_DAILY_VALUE_FIELDS)] / _DAILY_VALUE_VECTOR * 100
     
+    for i, amounts, percentages in zip(found, scaled.tolist(), daily_values.tolist()):
+        results[i] = _serving(sizes[i], amounts, percentages)
+    return results
+
+
+def _serving(grams, amounts, daily_values):
+    """Build a calculate_serving result from scaled amounts and daily value percentages"""
+    # round() rather than np.round: np.round scales by 10 before rounding,
+    # which lands differently on values near a half (4.45 -> 4.4, not 4.5)
     return {
         'serving_size': f'{grams}g',
-        'calories': round(info['calories'] * multiplier, 1),
-        'carbohydrates': round(info['carbohydrates'] * multiplier, 1),
-        'fiber': round(info['fiber'] * multiplier, 1),
-        'sugar': round(info['sugar'] * multiplier, 1),
-        'protein': round(info['protein'] * multiplier, 1),
-        'fat': round(info['fat'] * multiplier, 1),
+        **{field: round(value, 1) for field, value in zip(_SERVING_FIELDS, amounts)},
         'daily_values': {
-            'calories': round((info['calories'] * multiplier / DAILY_VALUES['calories']) * 100, 1),
-            'carbohydrates': round((info['carbohydrates'] * multiplier / DAILY_VALUES['carbohydrates']) * 100, 1),
-            'fiber': round((info['fiber'] * multiplier / DAILY_VALUES['fiber']) * 100, 1),
-            'sugar': round((info['sugar'] * multiplier / DAILY_VALUES['sugar']) * 100, 1),
-            'protein': round((info['protein'] * multiplier / DAILY_VALUES['protein']) * 100, 1)
+            field: round(value, 1) for field, value in zip(_DAILY_VALUE_FIELDS, daily_values)
         }
     }
 
@@ -668,33 +559,31 @@ def get_recipes(fruit_class, recipe_type=None):
     Returns:
         List of recipes
     """
-    info = NUTRITION_DATABASE.get(fruit_class)
-    if not info:
-        return []
-    
-    recipes = info.get('recipes', [])
+    recipes = _tables().recipes.get(fruit_class)
+    if recipes is None:
+        return ()
     
-    if recipe_type:
-        recipes = [r for r in recipes if r.get('type') == recipe_type]
-    
-    return recipes
+    # Shared, so returned as a tuple
+    return recipes.get(recipe_type or None, ())
 
 
+@lru_cache(maxsize=512)
 def get_storage_info(fruit_class):
     """Get storage information for a fruit"""
-    info = NUTRITION_DATABASE.get(fruit_class)
+    info = _tables().database.get(fruit_class)
     if not info:
         return None
-    return info.get('storage', {})
+    return MappingProxyType(info.get('storage', {}))
 
 
+@lru_cache(maxsize=512)
 def get_glycemic_info(fruit_class):
     """Get glycemic index information for a fruit"""
-    info = NUTRITION_DATABASE.get(fruit_class)
+    info = _tables().database.get(fruit_class)
     if not info:
         return None
-    return {
+    return MappingProxyType({
         'glycemic_index': info.get('glycemic_index', 'N/A'),
         'glycemic_load': info.get('glycemic_load', 'N/A'),
         'category': info.get('gi_category', 'N/A')
-    }
+    })
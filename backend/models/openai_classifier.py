@@ -2,12 +2,47 @@
 OpenAI-based Fruit Classification
 Uses GPT-4 Vision to classify fruit images
 """
+import asyncio
 import base64
+import hashlib
+import io
+import json
 import os
-from openai import OpenAI
+import sqlite3
+import threading
+from collections import OrderedDict
+from openai import AsyncOpenAI
+from PIL import Image, ImageOps
 from backend.config import Config
 
 
+# Classification prompt; the response shape and the categories are set by the
+# JSON schema passed as response_format
+_PROMPT = (
+    "You are a fruit classification expert. Identify the fruit in this image and "
+    "its three most likely categories, with confidences between 0 and 1 (lower "
+    "when unsure; the closest category with low confidence if none matches) and "
+    "a brief reasoning."
+)
+
+# Longest image edge sent to the API; larger photos are downscaled and
+# recompressed first, as the vision model doesn't use the extra pixels
+_MAX_IMAGE_EDGE = 1024
+_JPEG_QUALITY = 85
+
+# Image types the API accepts as they are; anything else is sent as JPEG
+_API_MEDIA_TYPES = frozenset({'image/jpeg', 'image/png', 'image/gif', 'image/webp'})
+
+# Classification results kept in memory, in front of the on-disk cache
+_RESULT_CACHE_SIZE = 256
+_RESULT_CACHE_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS results (
+        key BLOB PRIMARY KEY,
+        result TEXT NOT NULL
+    ) WITHOUT ROWID
+"""
+
+
 class OpenAIFruitClassifier:
     def __init__(self, api_key=None, model=None):
         """
@@ -23,21 +58,203 @@ class OpenAIFruitClassifier:
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY in .env file")
         
-        self.client = OpenAI(api_key=self.api_key)
+        self.client = AsyncOpenAI(api_key=self.api_key)
         self.fruit_classes = Config.FRUIT_CLASSES
+        
+        # Everything predict derives from the class list alone. Structured
+        # outputs make the API return JSON matching the schema, with every
+        # class name one of ours
+        self._response_format = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "fruit_prediction",
+                "strict": True,
+                "schema": self._prediction_schema()
+            }
+        }
+        self._default_predictions = dict.fromkeys(self.fruit_classes, 0.001)
+        
+        # Bounds the API requests in flight across all callers
+        self.semaphore = asyncio.Semaphore(Config.OPENAI_CONCURRENCY)
+        
+        # Event loop the synchronous methods run requests on (started on first use)
+        self._loop = None
+        self._loop_lock = threading.Lock()
+        
+        # Results are cached by image content, salted with everything else
+        # that shapes the answer so a new model, prompt or class list misses
+        self.image_detail = Config.OPENAI_IMAGE_DETAIL
+        self._cache_salt = hashlib.sha256('\0'.join((
+            self.model, _PROMPT, *self.fruit_classes,
+            self.image_detail, str(_MAX_IMAGE_EDGE), str(_JPEG_QUALITY)
+        )).encode()).digest()
+        self._result_cache = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+        self._cache_db = self._open_cache_db(Config.OPENAI_CACHE_PATH)
+    
+    def _open_cache_db(self, path):
+        """Open the on-disk result cache, or None to cache in memory only"""
+        if not path:
+            return None
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+            db.execute(_RESULT_CACHE_SCHEMA)
+            return db
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  OpenAI result cache disabled: {e}")
+            return None
+    
+    def _cache_key(self, image_bytes):
+        """Cache key for an image's classification result"""
+        return hashlib.sha256(self._cache_salt + image_bytes).digest()
+    
+    def _cache_get(self, key):
+        """Cached classification result for a key, or None"""
+        with self._result_cache_lock:
+            result = self._result_cache.get(key)
+            if result is not None:
+                self._result_cache.move_to_end(key)
+            elif self._cache_db is not None:
+                row = self._cache_db.execute('SELECT result FROM results WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    result = row[0]
+                    self._remember(key, result)
+        # Stored as JSON so every caller gets its own copy
+        return json.loads(result) if result is not None else None
+    
+    def _cache_put(self, key, result):
+        """Cache a classification result"""
+        result = json.dumps(result)
+        with self._result_cache_lock:
+            self._remember(key, result)
+            if self._cache_db is not None:
+                try:
+                    self._cache_db.execute('INSERT OR REPLACE INTO results VALUES (?, ?)', (key, result))
+                except sqlite3.Error as e:
+                    print(f"⚠️  Failed to cache OpenAI result: {e}")
+    
+    def _remember(self, key, result):
+        """Add a result to the in-memory cache (lock held)"""
+        self._result_cache[key] = result
+        if len(self._result_cache) > _RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
     
-    def encode_image(self, image_path):
+    def _prediction_schema(self):
+        """JSON schema of a classification response"""
+        fruit_class = {"type": "string", "enum": list(self.fruit_classes)}
+        return {
+            "type": "object",
+            "properties": {
+                "predicted_class": fruit_class,
+                "confidence": {"type": "number"},
+                "top_3_predictions": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "class": fruit_class,
+                            "confidence": {"type": "number"}
+                        },
+                        "required": ["class", "confidence"],
+                        "additionalProperties": False
+                    }
+                },
+                "reasoning": {"type": "string"}
+            },
+            "required": ["predicted_class", "confidence", "top_3_predictions", "reasoning"],
+            "additionalProperties": False
+        }
+    
+    def _run(self, coroutine):
+        """
+        Run a coroutine to completion from synchronous code
+        
+        Every synchronous call shares one background event loop, so the async
+        client's connection pool and the semaphore stay bound to a single loop
+        (asyncio.run would start a new loop per call and strand both).
         """
-        Encode image to base64
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+    
+    def _prepare_image(self, image_bytes):
+        """
+        Get an image ready to send to the API
+        
+        Images within _MAX_IMAGE_EDGE in a type the API accepts are sent
+        unchanged. Larger ones (or other types) are upright-rotated, shrunk to
+        fit and recompressed as JPEG.
         
         Args:
-            image_path: Path to the image file
+            image_bytes: Raw bytes of the image file
+            
+        Returns:
+            Tuple of (image bytes, media type)
+        """
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                media_type = Image.MIME.get(img.format, 'image/jpeg')
+                if max(img.size) <= _MAX_IMAGE_EDGE and media_type in _API_MEDIA_TYPES:
+                    return image_bytes, media_type
+                
+                img = ImageOps.exif_transpose(img)
+                img.thumbnail((_MAX_IMAGE_EDGE, _MAX_IMAGE_EDGE), Image.LANCZOS)
+                buffer = io.BytesIO()
+                img.convert('RGB').save(buffer, format='JPEG', quality=_JPEG_QUALITY, optimize=True)
+                return buffer.getvalue(), 'image/jpeg'
+        except OSError:
+            # Not an image PIL can read; send it as before and let the API decide
+            return image_bytes, 'image/jpeg'
+    
+    def _data_url(self, image_bytes, media_type):
+        """
+        Build the base64 data URL for an image
+        
+        The prefix and the encoded bytes go into one buffer that is decoded to
+        str once, rather than decoding and then formatting into a second str.
+        
+        Args:
+            image_bytes: Raw bytes of the image
+            media_type: MIME type of the image
             
         Returns:
-            Base64 encoded image string
+            data: URL string
         """
+        url = bytearray(f"data:{media_type};base64,".encode('ascii'))
+        url += base64.b64encode(image_bytes)
+        return url.decode('ascii')
+    
+    def _read_image(self, image_path):
+        """Read the raw bytes of an image file"""
         with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode('utf-8')
+            return image_file.read()
+    
+    def _load_image(self, image_path):
+        """
+        Read an image and either find its cached result or encode it for the
+        API. Blocking (file, cache database and image work), so predict_async
+        runs it in a worker thread.
+        
+        Args:
+            image_path: Path to the image file
+            
+        Returns:
+            Tuple of (cache key, cached result or None, data URL or None)
+        """
+        # Identical images (under the same model and prompt) get the same answer
+        image_bytes = self._read_image(image_path)
+        cache_key = self._cache_key(image_bytes)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cache_key, cached, None
+        
+        image_bytes, media_type = self._prepare_image(image_bytes)
+        return cache_key, None, self._data_url(image_bytes, media_type)
     
     def predict(self, image_path):
         """
@@ -49,92 +266,70 @@ class OpenAIFruitClassifier:
         Returns:
             Dictionary with prediction results
         """
+        return self._run(self.predict_async(image_path))
+    
+    def predict_batch(self, image_paths):
+        """
+        Classify several fruit images with concurrent API requests
+        
+        Args:
+            image_paths: Paths to the image files
+            
+        Returns:
+            List of prediction result dictionaries, in order
+        """
+        return self._run(self.predict_batch_async(image_paths))
+    
+    async def predict_batch_async(self, image_paths):
+        """Classify several fruit images concurrently (see predict_batch)"""
+        return await asyncio.gather(*(self.predict_async(path) for path in image_paths))
+    
+    async def predict_async(self, image_path):
+        """Classify fruit image using OpenAI Vision API (see predict)"""
         try:
-            # Encode image
-            base64_image = self.encode_image(image_path)
+            # Off the event loop, so other requests' reads overlap API calls
+            cache_key, cached, image_url = await asyncio.to_thread(self._load_image, image_path)
+            if cached is not None:
+                return cached
             
-            # Prepare prompt
-            fruit_list = ", ".join(self.fruit_classes)
-            prompt = f"""You are a fruit classification expert. Analyze this image and identify the fruit.
-
-Available fruit categories: {fruit_list}
-
-Provide your response in the following JSON format:
-{{
-    "predicted_class": "FruitName",
-    "confidence": 0.95,
-    "top_3_predictions": [
-        {{"class": "FruitName1", "confidence": 0.95}},
-        {{"class": "FruitName2", "confidence": 0.03}},
-        {{"class": "FruitName3", "confidence": 0.02}}
-    ],
-    "reasoning": "Brief explanation of why you identified this fruit"
-}}
-
-Rules:
-1. The predicted_class MUST be one of the available categories listed above
-2. Confidence values should be between 0 and 1
-3. If you're not confident, give a lower confidence score
-4. If the image doesn't contain a fruit or doesn't match any category, use the closest match with lower confidence
-5. Only respond with valid JSON, no additional text"""
-
-            # Call OpenAI API
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {
-                                "type": "text",
-                                "text": prompt
-                            },
-                            {
-                                "type": "image_url",
-                                "image_url": {
-                                    "url": f"data:image/jpeg;base64,{base64_image}"
+            # Call OpenAI API, waiting for a free slot first
+            async with self.semaphore:
+                response = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {
+                                    "type": "text",
+                                    "text": _PROMPT
+                                },
+                                {
+                                    "type": "image_url",
+                                    "image_url": {
+                                        "url": image_url,
+                                        "detail": self.image_detail
+                                    }
                                 }
-                            }
-                        ]
-                    }
-                ],
-                max_tokens=500,
-                temperature=0.2
-            )
+                            ]
+                        }
+                    ],
+                    response_format=self._response_format,
+                    max_tokens=500,
+                    temperature=0.2
+                )
             
             # Parse response
-            result_text = response.choices[0].message.content.strip()
-            
-            # Remove markdown code blocks if present
-            if result_text.startswith("```json"):
-                result_text = result_text[7:]
-            if result_text.startswith("```"):
-                result_text = result_text[3:]
-            if result_text.endswith("```"):
-                result_text = result_text[:-3]
-            result_text = result_text.strip()
+            message = response.choices[0].message
+            result_text = message.content
+            if result_text is None:
+                raise ValueError(f"Model refused to classify: {getattr(message, 'refusal', None)}")
             
-            # Parse JSON
-            import json
+            # Parse JSON (already validated against the schema by the API)
             result = json.loads(result_text)
-            
-            # Validate and normalize the result
-            predicted_class = result.get('predicted_class', 'Unknown')
-            confidence = float(result.get('confidence', 0.5))
-            top_3 = result.get('top_3_predictions', [])
-            
-            # Ensure predicted_class is in our fruit classes
-            if predicted_class not in self.fruit_classes:
-                # Try to find a close match
-                predicted_class_lower = predicted_class.lower()
-                for fruit in self.fruit_classes:
-                    if fruit.lower() in predicted_class_lower or predicted_class_lower in fruit.lower():
-                        predicted_class = fruit
-                        break
-                else:
-                    # Default to first fruit if no match
-                    predicted_class = self.fruit_classes[0]
-                    confidence = 0.3
+            predicted_class = result['predicted_class']
+            confidence = float(result['confidence'])
+            top_3 = result['top_3_predictions']
             
             # Normalize top_3 predictions
             if len(top_3) < 3:
@@ -144,23 +339,21 @@ Rules:
                     if fruit not in existing_fruits and len(top_3) < 3:
                         top_3.append({'class': fruit, 'confidence': 0.01})
             
-            # Create all_predictions dictionary
-            all_predictions = {}
-            for pred in top_3:
-                all_predictions[pred['class']] = pred['confidence']
-            
-            # Add remaining fruits with minimal confidence
-            for fruit in self.fruit_classes:
-                if fruit not in all_predictions:
-                    all_predictions[fruit] = 0.001
+            # Create all_predictions dictionary, remaining fruits with minimal confidence
+            all_predictions = {
+                **self._default_predictions,
+                **{pred['class']: pred['confidence'] for pred in top_3}
+            }
             
-            return {
+            prediction = {
                 'predicted_class': predicted_class,
                 'confidence': confidence,
                 'top_3_predictions': top_3[:3],
                 'all_predictions': all_predictions,
                 'reasoning': result.get('reasoning', 'Classification completed')
             }
+            await asyncio.to_thread(self._cache_put, cache_key, prediction)
+            return prediction
             
         except json.JSONDecodeError as e:
             print(f"JSON Parse Error: {e}")
@@ -184,11 +377,11 @@ Rules:
     def test_connection(self):
         """Test OpenAI API connection"""
         try:
-            response = self.client.chat.completions.create(
+            response = self._run(self.client.chat.completions.create(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": "Hello"}],
                 max_tokens=10
-            )
+            ))
             return True
         except Exception as e:
             print(f"Connection test failed: {e}")
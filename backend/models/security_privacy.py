@@ -60,7 +60,13 @@ class SecurityManager:
     def _secure_delete(self, file_path: str):
         """Securely delete a file by overwriting before removal"""
         try:
-            file_size = os.path.getsize(file_path)
+            st = os.stat(file_path)
+            if st.st_nlink > 1:
+                # Other hardlinks share this data (e.g. a stored training
+                # sample), so only this name is removed
+                os.remove(file_path)
+                return
+            file_size = st.st_size
             with open(file_path, 'wb') as f:
                 # Overwrite with random bytes
                 f.write(os.urandom(file_size))
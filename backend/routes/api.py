@@ -13,14 +13,14 @@ from backend.utils.image_utils import (
     validate_image, format_confidence
 )
 from backend.models.nutrition_database import (
-    get_nutrition_info, get_all_fruits, NUTRITION_DATABASE,
+    get_nutrition_info, get_all_fruits, get_nutrition_database,
     compare_fruits, search_by_nutrient, get_low_gi_fruits,
     get_seasonal_fruits, calculate_serving, get_recipes,
     get_storage_info, get_glycemic_info
 )
 from backend.models.multilingual import (
     get_fruit_name, get_ui_text, get_supported_languages, 
-    translate_result, FRUIT_TRANSLATIONS, UI_TRANSLATIONS
+    get_ui_keys, translate_result
 )
 
 # Create blueprint
@@ -415,9 +415,10 @@ def get_nutrition(fruit_name):
 @api_bp.route('/nutrition', methods=['GET'])
 def get_all_nutrition():
     """Get nutritional information for all fruits"""
+    database = get_nutrition_database()
     return jsonify({
-        'fruits': NUTRITION_DATABASE,
-        'count': len(NUTRITION_DATABASE),
+        'fruits': database,
+        'count': len(database),
         'per_serving': '100g'
     }), 200
 
@@ -592,7 +593,7 @@ def translate():
         },
         'ui': {
             key: get_ui_text(key, language)
-            for key in UI_TRANSLATIONS.keys()
+            for key in get_ui_keys()
         }
     }), 200
 
@@ -946,7 +947,7 @@ def grade_batch():
             return jsonify({'error': 'Fruits array required'}), 400
         
         grading = create_grading_system()
-        result = grading.grade_batch(data['fruits'])
+        result = grading.grade_batch(data['fruits'], detailed=data.get('detailed', True))
         
         return jsonify(result), 200
     except Exception as e:
@@ -1495,8 +1496,8 @@ def get_retraining_status():
     try:
         from backend.models.model_retrainer import ModelRetrainer
         
-        retrainer = ModelRetrainer()
-        status = retrainer.get_retraining_status()
+        with ModelRetrainer() as retrainer:
+            status = retrainer.get_retraining_status()
         
         return jsonify(status), 200
     except Exception as e:
@@ -1526,17 +1527,17 @@ def add_training_sample():
         if not success:
             return jsonify({'error': f'Failed to save file: {image_path}'}), 500
         
-        retrainer = ModelRetrainer()
-        result = retrainer.add_training_sample(
-            image_path=image_path,
-            fruit_class=fruit_class,
-            verified=verified,
-            metadata={
-                'original_filename': file.filename,
-                'ripeness': request.form.get('ripeness'),
-                'quality_score': request.form.get('quality_score')
-            }
-        )
+        with ModelRetrainer() as retrainer:
+            result = retrainer.add_training_sample(
+                image_path=image_path,
+                fruit_class=fruit_class,
+                verified=verified,
+                metadata={
+                    'original_filename': file.filename,
+                    'ripeness': request.form.get('ripeness'),
+                    'quality_score': request.form.get('quality_score')
+                }
+            )
         
         return jsonify(result), 200 if result['success'] else 400
     except Exception as e:
@@ -1549,8 +1550,8 @@ def get_training_stats():
     try:
         from backend.models.model_retrainer import ModelRetrainer
         
-        retrainer = ModelRetrainer()
-        stats = retrainer.get_training_data_stats()
+        with ModelRetrainer() as retrainer:
+            stats = retrainer.get_training_data_stats()
         
         return jsonify(stats), 200
     except Exception as e:
@@ -1563,8 +1564,8 @@ def list_model_versions():
     try:
         from backend.models.model_retrainer import ModelRetrainer
         
-        retrainer = ModelRetrainer()
-        versions = retrainer.list_model_versions()
+        with ModelRetrainer() as retrainer:
+            versions = retrainer.list_model_versions()
         
         return jsonify({'versions': versions, 'count': len(versions)}), 200
     except Exception as e:
@@ -1579,11 +1580,11 @@ def run_retraining():
         
         data = request.get_json() or {}
         
-        retrainer = ModelRetrainer()
-        result = retrainer.run_full_retraining(
-            base_model=data.get('base_model', 'MobileNetV2'),
-            epochs=data.get('epochs')
-        )
+        with ModelRetrainer() as retrainer:
+            result = retrainer.run_full_retraining(
+                base_model=data.get('base_model', 'MobileNetV2'),
+                epochs=data.get('epochs')
+            )
         
         return jsonify(result), 200 if result.get('success') else 400
     except Exception as e:
@@ -8,7 +8,7 @@ from backend.models.fruit_classifier import FruitClassificationModel
 from backend.config import Config
 
 
-def train_model(train_data_dir, validation_data_dir=None, epochs=20, batch_size=32):
+def train_model(train_data_dir, validation_data_dir=None, epochs=20, batch_size=32, fine_tune_epochs=0):
     """
     Train the fruit classification model
     
@@ -17,11 +17,13 @@ def train_model(train_data_dir, validation_data_dir=None, epochs=20, batch_size=
         validation_data_dir: Path to validation data directory (optional)
         epochs: Number of training epochs
         batch_size: Batch size for training
+        fine_tune_epochs: Number of epochs to fine-tune the unfrozen base model
     """
     print("🍎 Starting Fruit Classification Model Training...")
     print(f"Training data: {train_data_dir}")
     print(f"Epochs: {epochs}")
     print(f"Batch size: {batch_size}")
+    print(f"Fine-tune epochs: {fine_tune_epochs}")
     print("-" * 50)
     
     # Check if training data exists
@@ -55,7 +57,8 @@ def train_model(train_data_dir, validation_data_dir=None, epochs=20, batch_size=
         train_data_dir=train_data_dir,
         validation_data_dir=validation_data_dir,
         epochs=epochs,
-        batch_size=batch_size
+        batch_size=batch_size,
+        fine_tune_epochs=fine_tune_epochs
     )
     
     # Save model
@@ -101,6 +104,7 @@ if __name__ == "__main__":
     parser.add_argument('--val-dir', type=str, help='Path to validation data directory')
     parser.add_argument('--epochs', type=int, default=20, help='Number of epochs')
     parser.add_argument('--batch-size', type=int, default=32, help='Batch size')
+    parser.add_argument('--fine-tune-epochs', type=int, default=0, help='Epochs to fine-tune the unfrozen base model')
     parser.add_argument('--demo', action='store_true', help='Create demo model without training')
     
     args = parser.parse_args()
@@ -112,7 +116,8 @@ if __name__ == "__main__":
             train_data_dir=args.train_dir,
             validation_data_dir=args.val_dir,
             epochs=args.epochs,
-            batch_size=args.batch_size
+            batch_size=args.batch_size,
+            fine_tune_epochs=args.fine_tune_epochs
         )
     else:
         print("Usage:")